@@ -1,37 +1,188 @@
 # api_server.py
+import asyncio
+import concurrent.futures
+import importlib.util
 import json
-from typing import List, Tuple, Dict
+import os
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, List, Tuple, Dict, Optional
 # from openai import OpenAI
 
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 
 from rag_answer import analyze_legal_case, answer_question
+from case_history import init_case_history_db, save_case, list_cases, get_case
 from legal_assistant.retrieval.ingest_uploaded import (
     ingest_uploaded_files_into_vector_store,
 )
+from legal_assistant.utils.extract_cache import get_or_extract
 from legal_assistant.utils.universal_extraction import (
-    extract_text_from_upload,
+    AUDIO_EXTENSIONS,
+    DocumentSource,
     ExtractedText,
+    STREAMABLE_EXTENSIONS,
+    TEXT_EXTENSIONS,
+    shutdown_pdf_pool,
 )
 from legal_assistant.relevance_logger import (
+    UPSERT_DECISION,
+    ensure_relevance_decisions_table,
     log_relevance_decision,
     log_llm_error,
 )
 from legal_assistant.llm import ModelSelector
+from legal_assistant.utils.fast_json import dumps as json_dumps, loads as json_loads
+from legal_assistant.utils.logging_setup import get_logger
+from legal_assistant.utils.tokens import truncate_to_tokens
+from legal_assistant.llm.embeddings_client import get_embedding_client
+from legal_assistant.llm.chat_client import log_prompt_cache_usage
+from legal_assistant.relevance_prefilter import (
+    PREFILTER_MIN_HITS,
+    PREFILTER_MIN_SIMILARITY,
+    build_criteria_pattern,
+    cosine_similarity,
+    count_criteria_hits,
+    criteria_stems,
+)
+from legal_assistant.relevance_cache import (
+    find_similar_verdict,
+    get_cached_verdict,
+    get_document_embedding,
+    hash_text,
+    make_cache_key,
+    prune_cache,
+    store_verdict,
+)
 
 # --- OpenAI client setup (lazy)
-import os
-from openai import AzureOpenAI
+import httpx
+from openai import AsyncAzureOpenAI, RateLimitError
 from legal_assistant.config import get_settings
 
 # NEW: SQL imports
-from legal_assistant.db import get_engine
-from sqlalchemy import text as sql_text
+from legal_assistant.db import get_engine, run_in_transaction
+from sqlalchemy.exc import IntegrityError
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the Azure client (and its connection pool) up front; endpoints
+    # still raise a clear error later if the env isn't configured.
+    try:
+        get_azure_client()
+        get_chat_model_name()
+    except RuntimeError as e:
+        logger.warning("Azure OpenAI client not created at startup: %s", e)
+    # Cohere client setup runs in a thread so it doesn't block the loop
+    try:
+        await asyncio.to_thread(get_embedding_client)
+    except Exception as e:
+        logger.warning("Embedding client not created at startup: %s", e)
+    if CASE_HISTORY_ENABLED:
+        init_case_history_db()
+    # Created per startup (not at import), so a second lifespan in the same
+    # process (tests, embedded servers, reload) gets a live pool
+    app.state.extract_pool = concurrent.futures.ThreadPoolExecutor(
+        max_workers=EXTRACT_WORKERS, thread_name_prefix="extract"
+    )
+    yield
+    app.state.extract_pool.shutdown(wait=False, cancel_futures=True)
+    del app.state.extract_pool
+    await asyncio.to_thread(shutdown_pdf_pool)
+    client = getattr(get_azure_client, "_client", None)
+    if client is not None:
+        await client.close()
+        del get_azure_client._client
+
+
+app = FastAPI(lifespan=lifespan)
+logger = get_logger("api")
+
+# Relevance check: numeric labels stored in dbo.RelevanceDecisions (4 = failed)
+CATEGORY_LABELS = {
+    "highly_relevant": 3,
+    "partially_relevant": 2,
+    "less_relevant": 1,
+    "not_relevant": 0,
+}
+
+# Max concurrent Azure OpenAI calls per request, and retries on 429
+LLM_MAX_CONCURRENCY = 8
+LLM_MAX_RETRIES = 3
+
+# Max concurrent Cohere embedding calls across all requests; each one holds a
+# worker thread, so an unbounded fan-out would also starve the thread pool
+EMBED_MAX_CONCURRENCY = int(os.getenv("EMBED_MAX_CONCURRENCY", "4"))
+_embed_semaphore = asyncio.Semaphore(EMBED_MAX_CONCURRENCY)
+
+# Documents classified per relevance chat call (1 = one call per file)
+RELEVANCE_BATCH_SIZE = max(1, int(os.getenv("RELEVANCE_BATCH_SIZE", "4")))
+
+# Shared HTTP pool for all Azure OpenAI calls, so concurrent relevance checks
+# reuse keep-alive connections instead of each paying the TCP+TLS handshake
+AZURE_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+AZURE_HTTP_TIMEOUT = httpx.Timeout(60.0)
+# HTTP/2 multiplexes concurrent calls over one connection; httpx needs the
+# optional h2 package for it (pip install "httpx[http2]")
+AZURE_HTTP2 = importlib.util.find_spec("h2") is not None
+
+# Save each analyze-case result to the SQLite case history (data/case_history.db)
+CASE_HISTORY_ENABLED = os.getenv("CASE_HISTORY_ENABLED", "1") == "1"
+
+# Text extraction (PDF parsing, Whisper transcription) gets its own worker
+# threads (app.state.extract_pool, created in lifespan), so a large
+# multi-file upload can't use up the default executor that the cache / DB
+# helpers run on
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", str(os.cpu_count() or 4)))
+
+# Reject requests whose uploads add up to more than this (bytes)
+MAX_UPLOAD_TOTAL_BYTES = int(os.getenv("MAX_UPLOAD_TOTAL_BYTES", str(200 * 1024 * 1024)))
+
+# Token budget per document in a relevance prompt (~12k chars of English)
+RELEVANCE_DOC_MAX_TOKENS = int(os.getenv("RELEVANCE_DOC_MAX_TOKENS", "3000"))
+# Ask-question prompt budget: per uploaded document, and for all excerpts together
+ASK_DOC_MAX_TOKENS = int(os.getenv("ASK_DOC_MAX_TOKENS", "1000"))
+ASK_CONTEXT_MAX_TOKENS = int(os.getenv("ASK_CONTEXT_MAX_TOKENS", "4000"))
+
+# Relevance check only sends the start of a document to the LLM, so
+# plain-text uploads are read up to this many bytes instead of in full
+RELEVANCE_TEXT_READ_CAP = 64 * 1024
+
+# Static part of the relevance system prompt. The per-request criteria is
+# appended after it, so every call in a request shares one byte-identical
+# prefix that Azure prompt caching can reuse.
+RELEVANCE_INSTRUCTIONS = """You are a careful legal assistant. Always follow the JSON schema exactly.
+
+You are assisting a legal analyst.
 
-app = FastAPI()
+Your task:
+1. Read the relevance criteria.
+2. Read the documents supplied by the user, given as a JSON array of {"id": ..., "text": ...} objects.
+3. For EACH document, decide whether it is HIGHLY_RELEVANT, PARTIALLY_RELEVANT, LESS_RELEVANT, or NOT_RELEVANT to the criteria. If a document is malformed/unreadable, mark it as FAILED.
+4. Produce an email-style summary and a clear explanation for each document.
+
+Return ONLY a JSON object of the form {"results": [...]} with exactly one entry per document id. Each entry has the following fields:
+- "id": the id of the document the entry is about
+- "category": one of "highly_relevant", "partially_relevant", "less_relevant", "not_relevant", "failed"
+- "summary": 2-3 sentence email-style summary of the document
+- "reason": short explanation of WHY it is categorized this way (or why it failed)
+- "snippets": an array of 1-3 short text snippets from the document that best support your decision (can be empty if failed)
+
+"""
+
+ASK_SYSTEM_PROMPT = (
+    "You are a careful legal assistant. Base answers only on provided documents "
+    "and clearly note if information is missing.\n\n"
+    "You are assisting a legal analyst. Answer the user's question using ONLY the "
+    "provided document excerpts. If the answer is uncertain, say so."
+)
 
+# Set once dbo.RelevanceDecisions has been created / upgraded in this process
+_decisions_table_ready = False
 
 # Simple selector instance for lightweight chat usage
 _selector: ModelSelector | None = None
@@ -51,7 +202,7 @@ class QARequest(BaseModel):
 
 def get_azure_client():
     """
-    Lazily create and cache a single AzureOpenAI client.
+    Lazily create and cache a single AsyncAzureOpenAI client.
 
     We read values from environment variables first (OPENAI_BASE_URL, OPENAI_API_KEY,
     OPENAI_API_VERSION) and fall back to the Settings object if present.
@@ -89,25 +240,36 @@ def get_azure_client():
                 "are set in your .env (and that uvicorn is started from the project root)."
             )
 
-        get_azure_client._client = AzureOpenAI(
+        get_azure_client._client = AsyncAzureOpenAI(
             azure_endpoint=base_url,
             api_key=api_key,
             api_version=api_version,
+            http_client=httpx.AsyncClient(
+                http2=AZURE_HTTP2, limits=AZURE_HTTP_LIMITS, timeout=AZURE_HTTP_TIMEOUT
+            ),
         )
 
     return get_azure_client._client
 
 
+@lru_cache(maxsize=1)
+def get_chat_model_name() -> str:
+    """
+    Resolve the chat deployment name once; the env doesn't change while the
+    server runs. A missing value raises (and isn't cached).
+    """
+    settings = get_settings()
+    env_model = os.getenv("OPENAI_CHAT_MODEL")
+    model_name = env_model or getattr(settings, "OPENAI_CHAT_MODEL", None) or getattr(settings, "chat_model", None)
+    if not model_name:
+        raise RuntimeError("OPENAI_CHAT_MODEL is not configured")
+    return model_name
+
+
 def require_azure_client_and_settings():
     """Shared helper to fetch the Azure client and settings with clear errors."""
     try:
-        client = get_azure_client()
-        settings = get_settings()
-        env_model = os.getenv("OPENAI_CHAT_MODEL")
-        model_name = env_model or getattr(settings, "OPENAI_CHAT_MODEL", None) or getattr(settings, "chat_model", None)
-        if not model_name:
-            raise RuntimeError("OPENAI_CHAT_MODEL is not configured")
-        return client, model_name
+        return get_azure_client(), get_chat_model_name()
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -115,6 +277,141 @@ def require_azure_client_and_settings():
         )
 
 
+async def read_uploads(
+    files: List[UploadFile],
+    text_read_cap: Optional[int] = None,
+    stream_documents: bool = False,
+) -> List[DocumentSource]:
+    """
+    Read every upload concurrently so spooled-to-disk files overlap their I/O.
+
+    The combined declared size is checked first so an oversized request is
+    rejected before anything is pulled into memory. If text_read_cap is set,
+    plain-text files (.txt/.md/.csv/.log) are only read up to that many bytes;
+    binary formats (PDF, DOCX, EML, audio) always need the whole file to parse.
+
+    With stream_documents, PDF/DOCX/PPTX and audio uploads are returned as
+    their spooled temp file (UploadFile.file) instead of bytes; extraction
+    parses or copies them from there without a full in-memory copy.
+    """
+    total_size = sum(f.size or 0 for f in files)
+    if total_size > MAX_UPLOAD_TOTAL_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Uploaded files exceed the {MAX_UPLOAD_TOTAL_BYTES // (1024 * 1024)} MB limit",
+        )
+
+    async def as_stream(f: UploadFile):
+        return f.file
+
+    def read_one(f: UploadFile):
+        ext = Path(f.filename or "").suffix.lower()
+        if stream_documents and (ext in STREAMABLE_EXTENSIONS or ext in AUDIO_EXTENSIONS):
+            return as_stream(f)
+        if text_read_cap is not None and ext in TEXT_EXTENSIONS:
+            return f.read(text_read_cap)
+        return f.read()
+
+    return list(await asyncio.gather(*(read_one(f) for f in files)))
+
+
+async def embed_document(embed_client, text: str):
+    """get_document_embedding in a worker thread, bounded by _embed_semaphore."""
+    async with _embed_semaphore:
+        return await asyncio.to_thread(get_document_embedding, embed_client, text)
+
+
+async def extract_upload(filename: str, data: DocumentSource) -> ExtractedText:
+    """
+    Run (cached) text extraction on the extraction pool, or on the default
+    executor if the app was started without its lifespan.
+    """
+    loop = asyncio.get_running_loop()
+    pool = getattr(app.state, "extract_pool", None)
+    return await loop.run_in_executor(pool, get_or_extract, filename, data)
+
+
+def _as_text(value: Any) -> str:
+    """Model-supplied field as a stripped string ("" for null/missing)."""
+    if value is None:
+        return ""
+    return (value if isinstance(value, str) else str(value)).strip()
+
+
+def parse_llm_verdicts(content: str) -> Dict[int, dict]:
+    """
+    Turn the model's {"results": [...]} JSON reply into normalized verdict
+    dicts keyed by document id. Entries without a usable id are dropped, and
+    fields of the wrong type are coerced rather than trusted.
+    """
+    parsed = json_loads(content)
+    results = parsed.get("results") if isinstance(parsed, dict) else None
+    if not isinstance(results, list):
+        return {}
+
+    verdicts: Dict[int, dict] = {}
+    for entry in results:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            doc_id = int(entry.get("id"))
+        except (TypeError, ValueError):
+            continue
+        snippets = entry.get("snippets")
+        if isinstance(snippets, str):
+            snippets = [snippets]
+        elif not isinstance(snippets, list):
+            snippets = []
+        verdicts[doc_id] = {
+            "category": _as_text(entry.get("category")).lower(),
+            "summary": _as_text(entry.get("summary")),
+            "reason": _as_text(entry.get("reason")),
+            "snippets": [_as_text(s) for s in snippets if s is not None],
+        }
+    return verdicts
+
+
+def log_relevance_decisions(decisions: List[dict]) -> None:
+    """
+    Upsert all relevance decisions for a request with a single executemany
+    (one row per file + criteria; re-runs update the existing row).
+
+    Everything runs on one connection inside one transaction (retried once on
+    a new connection if the pooled one was dropped). If the batch hits an
+    IntegrityError, it is rolled back to a savepoint and the rows are retried
+    one by one, each under its own savepoint, so the good rows are still
+    written and only the offending ones are dropped.
+    """
+    global _decisions_table_ready
+    if not decisions:
+        return
+
+    try:
+        engine = get_engine()
+        if not _decisions_table_ready:
+            ensure_relevance_decisions_table(engine)
+            _decisions_table_ready = True
+
+        def upsert(conn) -> None:
+            try:
+                with conn.begin_nested():
+                    conn.execute(UPSERT_DECISION, decisions)
+                return
+            except IntegrityError as db_err:
+                logger.warning("Batch insert of %d relevance decisions failed, retrying per row: %s", len(decisions), db_err)
+
+            for row in decisions:
+                try:
+                    with conn.begin_nested():
+                        conn.execute(UPSERT_DECISION, row)
+                except Exception as db_err:
+                    logger.warning("Failed to log relevance decision for %s: %s", row["file_name"], db_err)
+
+        run_in_transaction(engine, upsert)
+    except Exception as db_err:
+        logger.warning("Failed to log %d relevance decisions: %s", len(decisions), db_err)
+
+
 # Allow your React app (localhost:3000) to call this API
 app.add_middleware(
     CORSMiddleware,
@@ -154,43 +451,70 @@ async def analyze_case_endpoint(
     """
     # 1) Parse metadata from the form
     try:
-        meta = json.loads(metadata)
+        meta = json_loads(metadata)
     except json.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid metadata JSON")
 
-    # 2) Read file contents into memory
-    file_payloads: List[Tuple[str, bytes]] = []
-    for f in files:
-        content = await f.read()
-        file_payloads.append((f.filename, content))
+    # 2) Read the uploads (all concurrently); PDF/DOCX/PPTX and audio stay in
+    #    their spooled temp files and are hashed / parsed from there
+    contents = await read_uploads(files, stream_documents=True)
+    file_payloads: List[Tuple[str, DocumentSource]] = list(zip([f.filename for f in files], contents))
 
     # 3) Ingest uploaded files into the vector store
     #    (this is your existing RAG ingestion)
-    ingest_uploaded_files_into_vector_store(file_payloads)
+    #    Ingest (extraction + embedding) and the analysis call are blocking,
+    #    so they run in worker threads instead of stalling the event loop
+    await asyncio.to_thread(ingest_uploaded_files_into_vector_store, file_payloads)
 
     # 4) Run RAG case analysis using your existing function in rag.py
     filenames = [name for name, _ in file_payloads]
-    result = analyze_legal_case(metadata=meta, filenames=filenames)
+    result = await asyncio.to_thread(analyze_legal_case, metadata=meta, filenames=filenames)
 
     # Debug logging
     sources = result.get("sources", [])
-    print(f"[DEBUG] Total sources: {len(sources)}")
+    logger.debug("Total sources: %d", len(sources))
     audio_sources = [s for s in sources if s.get('file', '').endswith(('.mp3', '.wav', '.m4a'))]
-    print(f"[DEBUG] Audio sources: {len(audio_sources)}")
+    logger.debug("Audio sources: %d", len(audio_sources))
     if audio_sources:
         for a in audio_sources[:3]:
-            print(f"[DEBUG] Audio: {a.get('file')} (score: {a.get('score', 0):.4f})")
+            logger.debug("Audio: %s (score: %.4f)", a.get("file"), a.get("score", 0))
     else:
-        print("[DEBUG] NO AUDIO SOURCES IN RETRIEVAL RESULTS!")
-    
-    # 5) Return what the React UI expects (including sources for citation tracking)
+        logger.debug("NO AUDIO SOURCES IN RETRIEVAL RESULTS!")
+
+    # 5) Record the case; a history failure shouldn't fail the analysis
+    case_id = None
+    if CASE_HISTORY_ENABLED:
+        try:
+            case_id = await asyncio.to_thread(
+                save_case, meta, filenames, result.get("analysis", ""), result.get("issues", [])
+            )
+        except Exception as e:
+            logger.warning("Failed to save case history: %s", e)
+
+    # 6) Return what the React UI expects (including sources for citation tracking)
     return {
         "analysis": result.get("analysis", ""),
         "issues": result.get("issues", []),
         "sources": result.get("sources", []),
+        "caseId": case_id,
     }
 
 
+@app.get("/api/cases")
+async def list_cases_endpoint(limit: int = 50):
+    """Recent saved analyses, newest first (metadata and filenames only)."""
+    return await asyncio.to_thread(list_cases, limit)
+
+
+@app.get("/api/cases/{case_id}")
+async def get_case_endpoint(case_id: int):
+    """One saved analysis, including its analysis text and issues."""
+    case = await asyncio.to_thread(get_case, case_id)
+    if case is None:
+        raise HTTPException(status_code=404, detail="Case not found")
+    return case
+
+
 # -------------------------------------------------------------------
 # NEW endpoint: relevance check
 # -------------------------------------------------------------------
@@ -218,7 +542,7 @@ async def relevance_check_endpoint(
     meta_obj = None
     if metadata:
         try:
-            meta_obj = json.loads(metadata)
+            meta_obj = json_loads(metadata)
         except json.JSONDecodeError:
             raise HTTPException(status_code=400, detail="Invalid metadata JSON")
 
@@ -238,214 +562,291 @@ async def relevance_check_endpoint(
     not_relevant = []
     failed_docs = []
 
-    for upload in files:
-        raw_bytes = await upload.read()
+    # Only the criteria varies between requests; it goes after the shared instructions
+    system_prompt = (
+        RELEVANCE_INSTRUCTIONS
+        + 'Relevance criteria:\n"""' + criteria_text + '"""\n'
+    )
 
-        # Use universal extraction for all file types
-        extracted: ExtractedText = extract_text_from_upload(upload.filename, raw_bytes)
-        
-        if extracted.error:
-            reason = f"Extraction failed: {extracted.error}"
-            failed_docs.append(
-                {
-                    "name": upload.filename,
-                    "reason": reason,
-                }
-            )
+    # Keyword prefilter: documents that mention (almost) none of the criteria
+    # terms are marked not_relevant without an LLM call
+    stems = criteria_stems(criteria_text)
+    criteria_pattern = build_criteria_pattern(stems) if PREFILTER_MIN_HITS > 0 else None
+    min_hits = min(PREFILTER_MIN_HITS, len(stems))
+
+    # Cap in-flight LLM calls so a large upload doesn't trip Azure rate limits
+    semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+
+    # Verdict cache: embeddings are only used for near-duplicate lookups, so
+    # keep going (exact-match only) if the embedding client isn't available.
+    # Verdicts are scoped to the model that produced them, so switching
+    # deployments doesn't serve answers from the old one
+    criteria_hash = hash_text(model_name + "\x1f" + criteria_text)
+    cache_writes: List[str] = []
+    try:
+        embed_client = get_embedding_client()
+    except Exception as e:
+        logger.warning("Embedding client unavailable, semantic cache disabled: %s", e)
+        embed_client = None
 
-            # Log FAILED to SQL (label = 4)
-            try:
-                engine = get_engine()
-                with engine.begin() as conn:
-                    conn.execute(
-                        sql_text(
-                            """
-                            INSERT INTO dbo.RelevanceDecisions
-                                (FileName, Criteria, EmailBody, RelevanceLabel, Citation)
-                            VALUES
-                                (:file_name, :criteria, :email_body, :label, :citation)
-                            """
-                        ),
-                        {
-                            "file_name": upload.filename,
-                            "criteria": criteria_text,
-                            "email_body": None,
-                            "label": 4,
-                            "citation": reason,
-                        },
-                    )
-            except Exception as db_err:
-                print(f"[WARN] Failed to log extraction error for {upload.filename}: {db_err}")
+    # Embedding screen: the criteria are embedded once per request and each
+    # document's (already needed) embedding is compared against them
+    criteria_embedding = None
+    if embed_client is not None and PREFILTER_MIN_SIMILARITY > 0:
+        try:
+            criteria_embedding = await embed_document(embed_client, criteria_text)
+        except Exception as e:
+            logger.warning("Criteria embedding failed, similarity prefilter disabled: %s", e)
+
+    def failed_result(filename: str, reason: str, email_body: Optional[str] = None) -> dict:
+        return {
+            "category": "failed",
+            "doc": {"name": filename, "reason": reason},
+            "label": 4,
+            "email_body": email_body,
+            "reason": reason,
+        }
+
+    def verdict_result(filename: str, verdict: dict, truncated_text: str) -> dict:
+        category = verdict["category"]
+        doc = {
+            "name": filename,
+            "summary": verdict["summary"],
+            "reason": verdict["reason"],
+            "snippets": verdict["snippets"],
+        }
+
+        # Map category → numeric label
+        label = CATEGORY_LABELS.get(category)
+        if label is None:
+            reason = doc["reason"] or "Model could not confidently classify this document."
+            return failed_result(filename, reason, truncated_text)
+
+        return {
+            "category": category,
+            "doc": doc,
+            "label": label,                # 0 / 1 / 2 / 3
+            "email_body": truncated_text,  # decoded body
+            "reason": doc["reason"],       # explanation from model
+        }
+
+    async def prepare_one(upload: UploadFile, raw_bytes: DocumentSource) -> dict:
+        """
+        Extract, prefilter and look up the verdict cache for a single upload.
+
+        Returns a finished result dict (category / doc / label / email_body /
+        reason), or, if the document still needs the LLM, a pending dict with
+        the text, cache key and embedding so it can be classified in a batch.
+        """
+        # Use universal extraction for all file types. PDF/DOCX parsing and
+        # audio transcription are slow, so keep them off the event loop.
+        extracted: ExtractedText = await extract_upload(upload.filename, raw_bytes)
 
-            continue
+        if extracted.error:
+            return failed_result(upload.filename, f"Extraction failed: {extracted.error}")
 
         trimmed = extracted.text.strip()
         if not trimmed:
-            reason = "File appears to be empty or contains no readable text."
-            failed_docs.append(
-                {
-                    "name": upload.filename,
-                    "reason": reason,
-                }
-            )
-
-            # Log FAILED to SQL (label = 4)
-            try:
-                engine = get_engine()
-                with engine.begin() as conn:
-                    conn.execute(
-                        sql_text(
-                            """
-                            INSERT INTO dbo.RelevanceDecisions
-                                (FileName, Criteria, EmailBody, RelevanceLabel, Citation)
-                            VALUES
-                                (:file_name, :criteria, :email_body, :label, :citation)
-                            """
-                        ),
-                        {
-                            "file_name": upload.filename,
-                            "criteria": criteria_text,
-                            "email_body": None,
-                            "label": 4,
-                            "citation": reason,
-                        },
-                    )
-            except Exception as db_err:
-                print(f"[WARN] Failed to log EMPTY file for {upload.filename}: {db_err}")
-
-            continue
+            return failed_result(upload.filename, "File appears to be empty or contains no readable text.")
 
         # Truncate if huge so prompt stays manageable
-        truncated_text = trimmed[:12000]
+        truncated_text = truncate_to_tokens(trimmed, RELEVANCE_DOC_MAX_TOKENS, snap_to_paragraph=True)
+
+        # 0) Prefilter: too few criteria terms in the document to bother the LLM
+        if criteria_pattern is not None:
+            hits = count_criteria_hits(criteria_pattern, truncated_text, stop_at=min_hits)
+            if hits < min_hits:
+                logger.debug("Prefilter: %s matched %d/%d criteria terms, skipping LLM", upload.filename, hits, min_hits)
+                verdict = {
+                    "category": "not_relevant",
+                    "summary": "",
+                    "reason": f"No criteria terms matched ({hits} of {min_hits} required); not sent to the LLM.",
+                    "snippets": [],
+                }
+                return verdict_result(upload.filename, verdict, truncated_text)
 
-        prompt = f"""
-You are assisting a legal analyst.
+        # 1) Exact cache hit: same criteria + same document text
+        cache_key = make_cache_key(model_name, criteria_text, truncated_text)
+        verdict = await asyncio.to_thread(get_cached_verdict, cache_key)
+        cache_note = "cache hit"
 
-Your task:
-1. Read the relevance criteria.
-2. Read the document text.
-3. Decide whether the document is HIGHLY_RELEVANT, PARTIALLY_RELEVANT, LESS_RELEVANT, or NOT_RELEVANT to the criteria. If the document is malformed/unreadable, mark it as FAILED.
-4. Produce an email-style summary and a clear explanation.
+        # 2) Near-duplicate hit: similar document embedding for the same criteria
+        doc_embedding = None
+        if verdict is None and embed_client is not None:
+            try:
+                doc_embedding = await embed_document(embed_client, truncated_text)
+                verdict = await asyncio.to_thread(find_similar_verdict, criteria_hash, doc_embedding)
+                cache_note = "cache hit: near-duplicate document"
+            except Exception as e:
+                logger.warning("Semantic cache lookup failed for %s: %s", upload.filename, e)
+
+        if verdict is not None:
+            result = verdict_result(upload.filename, verdict, truncated_text)
+            # Mark the logged citation so cached decisions are distinguishable in SQL
+            result["reason"] = f"{result['reason']} [{cache_note}]"
+            return result
+
+        # 3) Embedding prefilter: nothing in common with the criteria
+        if criteria_embedding is not None and doc_embedding is not None:
+            similarity = cosine_similarity(criteria_embedding, doc_embedding)
+            if similarity < PREFILTER_MIN_SIMILARITY:
+                logger.debug("Prefilter: %s similarity %.2f, skipping LLM", upload.filename, similarity)
+                verdict = {
+                    "category": "not_relevant",
+                    "summary": "",
+                    "reason": f"Low semantic overlap with criteria (similarity={similarity:.2f}); not sent to the LLM.",
+                    "snippets": [],
+                }
+                return verdict_result(upload.filename, verdict, truncated_text)
+
+        return {
+            "pending": True,
+            "filename": upload.filename,
+            "text": truncated_text,
+            "cache_key": cache_key,
+            "embedding": doc_embedding,
+        }
+
+    async def request_verdicts(batch: List[dict]) -> Dict[int, dict]:
+        """
+        One chat call for a batch of pending documents. Returns the parsed
+        verdicts keyed by the document's position in the batch.
+        """
+        # Only the documents vary per call; everything before them is in system_prompt
+        documents = json_dumps(
+            [{"id": i, "text": item["text"]} for i, item in enumerate(batch)]
+        )
+        user_content = f"Documents:\n{documents}\n"
+
+        async with semaphore:
+            completion = None
+            for attempt in range(LLM_MAX_RETRIES):
+                try:
+                    completion = await client.chat.completions.create(
+                        model=model_name,
+                        response_format={"type": "json_object"},
+                        messages=[
+                            {
+                                "role": "system",
+                                "content": system_prompt,
+                            },
+                            {
+                                "role": "user",
+                                "content": user_content,
+                            },
+                        ],
+                    )
+                    break
+                except RateLimitError:
+                    # 429: back off briefly and retry, give up on the last attempt
+                    if attempt == LLM_MAX_RETRIES - 1:
+                        raise
+                    await asyncio.sleep(0.05 * (2 ** attempt))
 
-Relevance criteria:
-\"\"\"{criteria_text}\"\"\"
+        log_prompt_cache_usage(completion, f"relevance ({len(batch)} document(s))")
 
-Document text:
-\"\"\"{truncated_text}\"\"\"
+        return parse_llm_verdicts(completion.choices[0].message.content)
 
-Return ONLY a JSON object with the following fields:
-- "category": one of "highly_relevant", "partially_relevant", "less_relevant", "not_relevant", "failed"
-- "summary": 2-3 sentence email-style summary of the document
-- "reason": short explanation of WHY it is categorized this way (or why it failed)
-- "snippets": an array of 1-3 short text snippets from the document that best support your decision (can be empty if failed)
-"""
+    async def classify_batch(batch: List[dict]) -> List[Any]:
+        """
+        Classify a batch of pending documents. Returns one verdict per
+        document, or the exception that kept it from being classified.
 
+        Documents the model leaves out of a multi-document reply (or the whole
+        batch, if that call fails) are retried one call per document.
+        """
         try:
-            completion = client.chat.completions.create(
-                model=model_name,
-                response_format={"type": "json_object"},
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a careful legal assistant. Always follow the JSON schema exactly.",
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt,
-                    },
-                ],
-            )
+            by_id = await request_verdicts(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                return [e]
+            logger.warning("Batch relevance call for %d documents failed, retrying per file: %s", len(batch), e)
+            by_id = {}
+
+        if len(batch) == 1:
+            return [by_id.get(0) or ValueError("model returned no result for the document")]
+
+        verdicts: List[Any] = [by_id.get(i) for i in range(len(batch))]
+        missing = [i for i, v in enumerate(verdicts) if v is None]
+        if missing:
+            retried = await asyncio.gather(*(classify_batch([batch[i]]) for i in missing))
+            for i, (verdict,) in zip(missing, retried):
+                verdicts[i] = verdict
+        return verdicts
+
+    contents = await read_uploads(files, text_read_cap=RELEVANCE_TEXT_READ_CAP, stream_documents=True)
+    results = await asyncio.gather(
+        *[prepare_one(upload, raw_bytes) for upload, raw_bytes in zip(files, contents)],
+        return_exceptions=True,
+    )
+    for index, result in enumerate(results):
+        if isinstance(result, Exception):
+            results[index] = failed_result(files[index].filename, f"Unexpected error processing file: {result}")
+
+    def decision_row(filename: str, result: dict) -> dict:
+        return {
+            "file_name": filename,
+            "criteria": criteria_text,
+            "email_body": result["email_body"],
+            "label": result["label"],
+            "citation": result["reason"],
+        }
+
+    # Everything that missed the prefilter and the cache goes to the LLM,
+    # RELEVANCE_BATCH_SIZE documents per call, with the batches in parallel
+    pending = [(i, r) for i, r in enumerate(results) if r.get("pending")]
+
+    # Files already settled (failed, prefiltered, cached) are logged to SQL
+    # Server in the background while the LLM calls below are in flight
+    settled_rows = [
+        decision_row(upload.filename, result)
+        for upload, result in zip(files, results)
+        if not result.get("pending")
+    ]
+    early_log = asyncio.create_task(asyncio.to_thread(log_relevance_decisions, settled_rows))
+
+    batches = [pending[i:i + RELEVANCE_BATCH_SIZE] for i in range(0, len(pending), RELEVANCE_BATCH_SIZE)]
+    batch_verdicts = await asyncio.gather(
+        *[classify_batch([item for _, item in batch]) for batch in batches]
+    )
 
-            content = completion.choices[0].message.content
-            parsed = json.loads(content)
-
-            category = (parsed.get("category") or "").lower()
-            doc = {
-                "name": upload.filename,
-                "summary": (parsed.get("summary") or "").strip(),
-                "reason": (parsed.get("reason") or "").strip(),
-                "snippets": parsed.get("snippets") or [],
-            }
-
-            # Map category → numeric label
-            if category == "highly_relevant":
-                label = 3
-                highly_relevant.append(doc)
-            elif category == "partially_relevant":
-                label = 2
-                partially_relevant.append(doc)
-            elif category == "less_relevant":
-                label = 1
-                less_relevant.append(doc)
-            elif category == "not_relevant":
-                label = 0
-                not_relevant.append(doc)
-            else:
-                label = 4
-                failed_docs.append(
-                    {
-                        "name": upload.filename,
-                        "reason": doc["reason"]
-                        or "Model could not confidently classify this document.",
-                    }
+    cache_stores = []
+    for batch, verdicts in zip(batches, batch_verdicts):
+        for (index, item), verdict in zip(batch, verdicts):
+            if isinstance(verdict, Exception):
+                reason = f"Error while analyzing document with LLM: {str(verdict)}"
+                results[index] = failed_result(item["filename"], reason, item["text"])
+                continue
+
+            # Only cache real classifications, never model-reported failures
+            if verdict["category"] in CATEGORY_LABELS:
+                cache_stores.append(
+                    asyncio.to_thread(store_verdict, item["cache_key"], criteria_hash, verdict, item["embedding"])
                 )
+                cache_writes.append(item["cache_key"])
+            results[index] = verdict_result(item["filename"], verdict, item["text"])
+
+    # --- Log the LLM-classified files (one round trip) and fill the cache ---
+    # The early batch goes first so only one call ever creates the table.
+    await early_log
+    llm_rows = [decision_row(files[index].filename, results[index]) for index, _ in pending]
+    await asyncio.gather(
+        asyncio.to_thread(log_relevance_decisions, llm_rows),
+        *cache_stores,
+    )
 
-            # --- Log decision into SQL Server ---
-            try:
-                engine = get_engine()
-                with engine.begin() as conn:
-                    conn.execute(
-                        sql_text(
-                            """
-                            INSERT INTO dbo.RelevanceDecisions
-                                (FileName, Criteria, EmailBody, RelevanceLabel, Citation)
-                            VALUES
-                                (:file_name, :criteria, :email_body, :label, :citation)
-                            """
-                        ),
-                        {
-                            "file_name": upload.filename,
-                            "criteria": criteria_text,
-                            "email_body": truncated_text,  # decoded body
-                            "label": label,                # 0 / 1 / 2 / 3 / 4
-                            "citation": doc["reason"],     # explanation from model
-                        },
-                    )
-            except Exception as db_err:
-                print(f"[WARN] Failed to log relevance decision for {upload.filename}: {db_err}")
-
-        except Exception as e:
-            reason = f"Error while analyzing document with LLM: {str(e)}"
-            failed_docs.append(
-                {
-                    "name": upload.filename,
-                    "reason": reason,
-                }
-            )
+    if cache_writes:
+        await asyncio.to_thread(prune_cache)
 
-            # Log FAILED LLM error to SQL (label = 4)
-            try:
-                engine = get_engine()
-                with engine.begin() as conn:
-                    conn.execute(
-                        sql_text(
-                            """
-                            INSERT INTO dbo.RelevanceDecisions
-                                (FileName, Criteria, EmailBody, RelevanceLabel, Citation)
-                            VALUES
-                                (:file_name, :criteria, :email_body, :label, :citation)
-                            """
-                        ),
-                        {
-                            "file_name": upload.filename,
-                            "criteria": criteria_text,
-                            "email_body": truncated_text if 'truncated_text' in locals() else None,
-                            "label": 4,
-                            "citation": reason,
-                        },
-                    )
-            except Exception as db_err:
-                print(f"[WARN] Failed to log LLM error for {upload.filename}: {db_err}")
+    buckets = {
+        "highly_relevant": highly_relevant,
+        "partially_relevant": partially_relevant,
+        "less_relevant": less_relevant,
+        "not_relevant": not_relevant,
+        "failed": failed_docs,
+    }
+    for result in results:
+        buckets[result["category"]].append(result["doc"])
 
     return {
         "highlyRelevant": highly_relevant,
@@ -459,19 +860,14 @@ Return ONLY a JSON object with the following fields:
 # -------------------------------------------------------------------
 # NEW endpoint: ask questions over uploaded files
 # -------------------------------------------------------------------
-@app.post("/api/ask-question")
-async def ask_question_endpoint(
-    question: str = Form(...),
-    metadata: str = Form(None),
-    files: List[UploadFile] = File(...),
-):
+async def build_ask_question_messages(
+    question: str, metadata: Optional[str], files: List[UploadFile]
+) -> Tuple[List[dict], List[dict]]:
     """
-    Given a natural-language question and uploaded files, return an LLM answer.
+    Validate the ask-question form and extract the uploads.
 
-    Reuses the same file handling pattern as the relevance endpoint:
-      - decode uploaded files as UTF-8 text
-      - skip empty/unreadable files
-      - truncate each document to keep prompt size manageable
+    Returns (chat messages, failed_docs). Shared by the JSON and the
+    streaming ask-question endpoints.
     """
     q = (question or "").strip()
     if not q:
@@ -480,21 +876,24 @@ async def ask_question_endpoint(
     meta_obj = None
     if metadata:
         try:
-            meta_obj = json.loads(metadata)
+            meta_obj = json_loads(metadata)
         except json.JSONDecodeError:
             raise HTTPException(status_code=400, detail="Invalid metadata JSON")
 
-    client, model_name = require_azure_client_and_settings()
-
     doc_chunks: List[str] = []
     failed_docs: List[dict] = []
 
-    for upload in files:
-        raw_bytes = await upload.read()
-        
-        # Use universal extraction for all file types
-        extracted: ExtractedText = extract_text_from_upload(upload.filename, raw_bytes)
-        
+    # Read and extract all uploads concurrently; extraction runs in worker
+    # threads so PDF parsing / transcription doesn't block the event loop
+    contents = await read_uploads(files, stream_documents=True)
+    extractions = await asyncio.gather(
+        *[
+            extract_upload(upload.filename, raw_bytes)
+            for upload, raw_bytes in zip(files, contents)
+        ]
+    )
+
+    for upload, extracted in zip(files, extractions):
         if extracted.error:
             failed_docs.append({"name": upload.filename, "reason": f"Extraction failed: {extracted.error}"})
             continue
@@ -504,37 +903,69 @@ async def ask_question_endpoint(
             failed_docs.append({"name": upload.filename, "reason": "File appears to be empty."})
             continue
 
-        snippet = trimmed[:4000]
+        snippet = truncate_to_tokens(trimmed, ASK_DOC_MAX_TOKENS, snap_to_paragraph=True)
         doc_chunks.append(f"File: {upload.filename}\n{snippet}")
 
     # Cap total context to avoid overly long prompts
-    combined_docs = "\n\n".join(doc_chunks)[:16000] if doc_chunks else "No readable documents were provided."
+    combined_docs = (
+        truncate_to_tokens("\n\n".join(doc_chunks), ASK_CONTEXT_MAX_TOKENS, snap_to_paragraph=True)
+        if doc_chunks
+        else "No readable documents were provided."
+    )
 
     meta_context = ""
     if meta_obj:
         meta_context = f"\n\nAdditional context from metadata:\n{json.dumps(meta_obj, indent=2)}"
 
-    prompt = f"""
-You are assisting a legal analyst. Answer the user's question using ONLY the provided document excerpts. If the answer is uncertain, say so.
-
-User question:
-\"\"\"{q}\"\"\"
-
-Document excerpts:
+    # Documents first, question last: follow-up questions over the same uploads
+    # share the system + excerpts prefix, which Azure prompt caching can reuse
+    excerpts = f"""Document excerpts:
 \"\"\"{combined_docs}\"\"\"{meta_context}
 """
+    question_content = f"""User question:
+\"\"\"{q}\"\"\"
+"""
+
+    messages = [
+        {
+            "role": "system",
+            "content": ASK_SYSTEM_PROMPT,
+        },
+        {"role": "user", "content": excerpts},
+        {"role": "user", "content": question_content},
+    ]
+    return messages, failed_docs
+
+
+def sse_event(data: Any, event: Optional[str] = None) -> str:
+    """Format one Server-Sent Events record with a JSON data line."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json_dumps(data)}\n\n"
+
+
+@app.post("/api/ask-question")
+async def ask_question_endpoint(
+    question: str = Form(...),
+    metadata: str = Form(None),
+    files: List[UploadFile] = File(...),
+):
+    """
+    Given a natural-language question and uploaded files, return an LLM answer.
+
+    Reuses the same file handling pattern as the relevance endpoint:
+      - decode uploaded files as UTF-8 text
+      - skip empty/unreadable files
+      - truncate each document to keep prompt size manageable
+    """
+    client, model_name = require_azure_client_and_settings()
+    messages, failed_docs = await build_ask_question_messages(question, metadata, files)
 
     try:
-        completion = client.chat.completions.create(
+        completion = await client.chat.completions.create(
             model=model_name,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a careful legal assistant. Base answers only on provided documents and clearly note if information is missing.",
-                },
-                {"role": "user", "content": prompt},
-            ],
+            messages=messages,
         )
+        log_prompt_cache_usage(completion, "ask-question")
 
         answer = completion.choices[0].message.content or ""
     except Exception as e:
@@ -546,6 +977,46 @@ Document excerpts:
     }
 
 
+@app.post("/api/ask-question-stream")
+async def ask_question_stream_endpoint(
+    question: str = Form(...),
+    metadata: str = Form(None),
+    files: List[UploadFile] = File(...),
+):
+    """
+    Same inputs as /api/ask-question, but the answer is streamed as
+    Server-Sent Events so the UI can show text as soon as it is generated:
+
+      data: {"delta": "..."}                     (repeated)
+      event: final / data: {"failed": [...]}     (once, at the end)
+      event: error / data: {"detail": "..."}     (instead of final on failure)
+    """
+    client, model_name = require_azure_client_and_settings()
+    messages, failed_docs = await build_ask_question_messages(question, metadata, files)
+
+    async def event_stream():
+        try:
+            stream = await client.chat.completions.create(
+                model=model_name,
+                messages=messages,
+                stream=True,
+            )
+            async for chunk in stream:
+                # Azure sends a leading chunk with no choices (content filter results)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield sse_event({"delta": delta})
+        except Exception as e:
+            logger.error("ask-question stream failed: %s", e)
+            yield sse_event({"detail": f"Error while answering question: {str(e)}"}, event="error")
+            return
+        yield sse_event({"failed": failed_docs}, event="final")
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @app.post("/api/ask")
 async def ask_conversational_endpoint(payload: QARequest):
     """
@@ -555,7 +1026,10 @@ async def ask_conversational_endpoint(payload: QARequest):
     if not payload.question.strip():
         raise HTTPException(status_code=400, detail="Question is required")
 
-    answer = answer_question(
+    # answer_question does blocking embedding/search/chat calls; keep them
+    # off the event loop so other requests aren't stalled behind it
+    answer = await asyncio.to_thread(
+        answer_question,
         question=payload.question,
         history=payload.history,
         top_k=10,
@@ -1,37 +1,52 @@
 # case_history.py
 import os
-import json
 import sqlite3
+import threading
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+from legal_assistant.utils.fast_json import dumps as json_dumps, loads as json_loads
+
 DB_DIR = "data"
 DB_PATH = os.path.join(DB_DIR, "case_history.db")
 
+# One long-lived connection per thread instead of connect/close per call
+_local = threading.local()
+
+
+def _get_conn() -> sqlite3.Connection:
+    """
+    Return this thread's connection, opening it on first use.
+    Autocommit mode (isolation_level=None): each statement commits on its own.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(DB_DIR, exist_ok=True)
+        conn = sqlite3.connect(DB_PATH, isolation_level=None)
+        # WAL lets readers (list_cases / get_case) run while save_case writes
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        _local.conn = conn
+    return conn
+
 
 def init_case_history_db() -> None:
     """
     Create the SQLite database + table if they don't exist yet.
     """
-    os.makedirs(DB_DIR, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS cases (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                created_at TEXT NOT NULL,
-                metadata_json TEXT NOT NULL,
-                filenames_json TEXT NOT NULL,
-                analysis TEXT NOT NULL,
-                issues_json TEXT NOT NULL
-            )
-            """
+    _get_conn().execute(
+        """
+        CREATE TABLE IF NOT EXISTS cases (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at TEXT NOT NULL,
+            metadata_json TEXT NOT NULL,
+            filenames_json TEXT NOT NULL,
+            analysis TEXT NOT NULL,
+            issues_json TEXT NOT NULL
         )
-        conn.commit()
-    finally:
-        conn.close()
+        """
+    )
 
 
 def save_case(
@@ -43,59 +58,47 @@ def save_case(
     """
     Insert a new case row and return the new case ID.
     """
-    conn = sqlite3.connect(DB_PATH)
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO cases (
-                created_at, metadata_json, filenames_json, analysis, issues_json
-            )
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (
-                datetime.utcnow().isoformat(timespec="seconds") + "Z",
-                json.dumps(metadata, ensure_ascii=False),
-                json.dumps(filenames, ensure_ascii=False),
-                analysis,
-                json.dumps(issues, ensure_ascii=False),
-            ),
+    cur = _get_conn().execute(
+        """
+        INSERT INTO cases (
+            created_at, metadata_json, filenames_json, analysis, issues_json
         )
-        conn.commit()
-        return cur.lastrowid
-    finally:
-        conn.close()
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        (
+            datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            json_dumps(metadata),
+            json_dumps(filenames),
+            analysis,
+            json_dumps(issues),
+        ),
+    )
+    return cur.lastrowid
 
 
 def list_cases(limit: int = 50) -> List[Dict[str, Any]]:
     """
     Return a list of recent cases, newest first.
     """
-    conn = sqlite3.connect(DB_PATH)
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT id, created_at, metadata_json, filenames_json
-            FROM cases
-            ORDER BY id DESC
-            LIMIT ?
-            """,
-            (limit,),
-        )
-        rows = cur.fetchall()
-    finally:
-        conn.close()
+    rows = _get_conn().execute(
+        """
+        SELECT id, created_at, metadata_json, filenames_json
+        FROM cases
+        ORDER BY id DESC
+        LIMIT ?
+        """,
+        (limit,),
+    ).fetchall()
 
     cases: List[Dict[str, Any]] = []
     for row in rows:
         case_id, created_at, meta_json, files_json = row
         try:
-            metadata = json.loads(meta_json)
+            metadata = json_loads(meta_json)
         except Exception:
             metadata = {}
         try:
-            filenames = json.loads(files_json)
+            filenames = json_loads(files_json)
         except Exception:
             filenames = []
 
@@ -114,35 +117,29 @@ def get_case(case_id: int) -> Optional[Dict[str, Any]]:
     """
     Fetch a single case by ID, or None if not found.
     """
-    conn = sqlite3.connect(DB_PATH)
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT id, created_at, metadata_json, filenames_json, analysis, issues_json
-            FROM cases
-            WHERE id = ?
-            """,
-            (case_id,),
-        )
-        row = cur.fetchone()
-    finally:
-        conn.close()
+    row = _get_conn().execute(
+        """
+        SELECT id, created_at, metadata_json, filenames_json, analysis, issues_json
+        FROM cases
+        WHERE id = ?
+        """,
+        (case_id,),
+    ).fetchone()
 
     if row is None:
         return None
 
     cid, created_at, meta_json, files_json, analysis, issues_json = row
     try:
-        metadata = json.loads(meta_json)
+        metadata = json_loads(meta_json)
     except Exception:
         metadata = {}
     try:
-        filenames = json.loads(files_json)
+        filenames = json_loads(files_json)
     except Exception:
         filenames = []
     try:
-        issues = json.loads(issues_json)
+        issues = json_loads(issues_json)
     except Exception:
         issues = []
 
@@ -1,22 +1,25 @@
 """
 Check the embedding quality and similarity scores for audio chunks directly.
 """
-import sqlite3
-import json
-from legal_assistant.llm.embeddings_client import EmbeddingClient
+import numpy as np
+from legal_assistant.llm.embeddings_client import get_embedding_client
+from legal_assistant.retrieval.vector_store import AUDIO_ROWS_SQL, embeddings_source_table, open_ro
 
 def check_audio_embeddings():
     """Verify audio chunks exist and test their similarity to a relevant query."""
     
     db_path = "data/index/embeddings.db"
-    conn = sqlite3.connect(db_path)
+    # Read-only: older databases are read through embeddings_source_table
+    # instead of being migrated
+    conn = open_ro(db_path)
     cursor = conn.cursor()
+    source_table = embeddings_source_table(conn)
     
-    # Get audio chunks
-    cursor.execute("""
-        SELECT id, document, metadata 
-        FROM embeddings 
-        WHERE metadata LIKE '%mp3%' OR id LIKE '%william%' OR id LIKE '%francis%'
+    # Get audio chunks (tagged source_type='audio', or an audio file extension)
+    cursor.execute(f"""
+        SELECT id, document, source_file
+        FROM {source_table}
+        WHERE {AUDIO_ROWS_SQL}
     """)
     
     audio_chunks = cursor.fetchall()
@@ -27,7 +30,7 @@ def check_audio_embeddings():
     
     print(f"✅ Found {len(audio_chunks)} audio chunks\n")
     
-    embed_client = EmbeddingClient()
+    embed_client = get_embedding_client()
     
     # Test queries that should match audio content
     test_queries = [
@@ -35,61 +38,62 @@ def check_audio_embeddings():
         "monitor workers surveillance email",
         "discrimination against Indian workers",
     ]
+
+    # Embed the queries once (one batched call) and L2-normalize them, so each
+    # chunk's scores are a single matrix-vector product
+    query_embs = np.asarray(embed_client.embed_texts(test_queries), dtype=np.float32)
+    query_embs /= np.linalg.norm(query_embs, axis=1, keepdims=True)
+
+    def score_queries(doc_embs) -> np.ndarray:
+        """Cosine scores as a (documents x queries) matrix, from one matmul."""
+        docs = np.asarray(doc_embs, dtype=np.float32)
+        docs /= np.linalg.norm(docs, axis=1, keepdims=True)
+        return docs @ query_embs.T
+
+    # Embed all audio chunks (embed_texts batches the API calls), then score
+    # them with one matmul
+    audio_docs = [doc for _, doc, _ in audio_chunks]
+    audio_scores = score_queries(embed_client.embed_texts(audio_docs))
     
-    for chunk_id, document, metadata_json in audio_chunks:
-        metadata = json.loads(metadata_json)
-        source_file = metadata.get("source_file", "unknown")
+    for (chunk_id, document, source_file), scores in zip(audio_chunks, audio_scores):
+        source_file = source_file or "unknown"
         
         print(f"=== Audio Chunk: {source_file} ===")
         print(f"Chunk ID: {chunk_id}")
         print(f"Text: {document}")
         print()
         
-        # Get embedding for this document
-        doc_emb = embed_client.embed_texts([document])[0]
-        
         print("Similarity scores to test queries:")
-        for query in test_queries:
-            query_emb = embed_client.embed_texts([query])[0]
-            
-            # Compute cosine similarity manually
-            import numpy as np
-            similarity = np.dot(doc_emb, query_emb) / (np.linalg.norm(doc_emb) * np.linalg.norm(query_emb))
-            
+        for query, similarity in zip(test_queries, scores):
             print(f"  '{query}': {similarity:.4f}")
         
         print("\n" + "="*80 + "\n")
     
-    conn.close()
-    
     # Now compare to a typical email chunk
     cursor = conn.cursor()
-    cursor.execute("""
-        SELECT id, document, metadata 
-        FROM embeddings 
-        WHERE metadata LIKE '%aiR0000003235%'
+    cursor.execute(f"""
+        SELECT id, document, source_file
+        FROM {source_table}
+        WHERE source_file LIKE 'aiR0000003235%'
         LIMIT 1
     """)
     
     email_chunk = cursor.fetchone()
     if email_chunk:
-        chunk_id, document, metadata_json = email_chunk
-        metadata = json.loads(metadata_json)
-        source_file = metadata.get("source_file", "unknown")
+        chunk_id, document, source_file = email_chunk
         
         print(f"=== Comparison: Email Chunk {source_file} ===")
         print(f"Text length: {len(document)} chars")
         print(f"Preview: {document[:200]}...")
         print()
         
-        doc_emb = embed_client.embed_texts([document])[0]
+        scores = score_queries(embed_client.embed_texts([document]))[0]
         
         print("Similarity scores to test queries:")
-        for query in test_queries:
-            query_emb = embed_client.embed_texts([query])[0]
-            import numpy as np
-            similarity = np.dot(doc_emb, query_emb) / (np.linalg.norm(doc_emb) * np.linalg.norm(query_emb))
+        for query, similarity in zip(test_queries, scores):
             print(f"  '{query}': {similarity:.4f}")
 
+    conn.close()
+
 if __name__ == "__main__":
     check_audio_embeddings()
@@ -1,36 +1,37 @@
 """Check what chunks were stored for the mp3 files."""
-import sqlite3
-import json
+
+from legal_assistant.retrieval.vector_store import AUDIO_ROWS_SQL, embeddings_source_table, open_ro
 
 DB = "data/index/embeddings.db"
-conn = sqlite3.connect(DB)
+# Read-only: older databases without the generated source columns are read
+# through embeddings_source_table instead of being migrated
+conn = open_ro(DB)
 cur = conn.cursor()
 
-# Get mp3 chunks
-cur.execute("""
-    SELECT id, metadata, document 
-    FROM embeddings 
-    WHERE metadata LIKE '%mp3%' OR metadata LIKE '%william%' OR metadata LIKE '%francis%'
+# Get audio chunks (tagged source_type='audio', or an audio file extension)
+# The metadata fields come from columns / json_extract, not json.loads per row
+cur.execute(f"""
+    SELECT id, source_file, source_type, chunk_index,
+           CASE WHEN json_valid(metadata) THEN json_extract(metadata, '$.transcription_method') END,
+           CASE WHEN json_valid(metadata) THEN json_extract(metadata, '$.language') END,
+           document
+    FROM {embeddings_source_table(conn)}
+    WHERE {AUDIO_ROWS_SQL}
 """)
 
 rows = cur.fetchall()
 print(f"Found {len(rows)} chunks for mp3 files\n")
 
 for row in rows:
-    chunk_id, meta_json, doc_text = row
-    
-    try:
-        meta = json.loads(meta_json)
-    except:
-        meta = {"raw": meta_json}
-    
+    chunk_id, source_file, source_type, chunk_index, method, language, doc_text = row
+
     print("="*60)
     print(f"Chunk ID: {chunk_id}")
-    print(f"Source file: {meta.get('source_file', 'unknown')}")
-    print(f"Source type: {meta.get('source_type', 'unknown')}")
-    print(f"Chunk index: {meta.get('chunk_index', 'unknown')}")
-    print(f"Transcription method: {meta.get('transcription_method', 'N/A')}")
-    print(f"Language: {meta.get('language', 'N/A')}")
+    print(f"Source file: {source_file or 'unknown'}")
+    print(f"Source type: {source_type or 'unknown'}")
+    print(f"Chunk index: {chunk_index if chunk_index is not None else 'unknown'}")
+    print(f"Transcription method: {method or 'N/A'}")
+    print(f"Language: {language or 'N/A'}")
     print(f"\nDocument text:")
     print(doc_text)
     print()
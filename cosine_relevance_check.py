@@ -1,25 +1,24 @@
-import math
 from typing import Dict, List, Tuple
 
-from legal_assistant.llm.embeddings_client import EmbeddingClient
+import numpy as np
+
+from legal_assistant.llm.embeddings_client import get_embedding_client
 from legal_assistant.retrieval.vector_store import VectorStore
 
 DB_PATH = "data/index/embeddings.db"  # same as the rest of your project
 
+# Lower score bounds of the buckets above not_relevant, ascending
+# (np.searchsorted maps a score to its bucket index in one call)
+CATEGORY_THRESHOLDS = np.array([0.45, 0.55, 0.70])
+CATEGORIES = ["not_relevant", "less_relevant", "partially_relevant", "highly_relevant"]
+
 
 def map_score_to_category(score: float) -> str:
     """
     Map cosine similarity -> relevance bucket.
     Tune these thresholds if you want to be stricter/looser.
     """
-    if score >= 0.70:
-        return "highly_relevant"
-    elif score >= 0.55:
-        return "partially_relevant"
-    elif score >= 0.45:
-        return "less_relevant"
-    else:
-        return "not_relevant"
+    return CATEGORIES[int(np.searchsorted(CATEGORY_THRESHOLDS, score, side="right"))]
 
 
 def main():
@@ -30,11 +29,11 @@ def main():
         return
 
     # 1) Setup embedding client + vector store
-    embed_client = EmbeddingClient()
+    embed_client = get_embedding_client()
     store = VectorStore(db_path=DB_PATH)
 
     # 2) Embed the criteria once
-    query_emb = embed_client.embed_texts([criteria])[0]
+    query_emb = embed_client.embed_one(criteria)
 
     # 3) Retrieve a fairly large top_k so we see many chunks
     #    This uses your existing cosine-similarity search under the hood.
@@ -43,32 +42,21 @@ def main():
         print("No chunks found in the vector store. Did you run ingest_* scripts?")
         return
 
-    # 4) Aggregate: best score per source_file
-    best_by_file: Dict[str, float] = {}
-    for _id, score, doc, meta in results:
-        fname = meta.get("source_file", "unknown")
-        prev = best_by_file.get(fname)
-        if prev is None or score > prev:
-            best_by_file[fname] = score
+    # 4) Aggregate: best score per source_file (group by file index, max-reduce)
+    files = np.array([meta.get("source_file", "unknown") for _, _, _, meta in results])
+    scores = np.array([score for _, score, _, _ in results])
+    unique_files, file_idx = np.unique(files, return_inverse=True)
+    best = np.full(len(unique_files), -np.inf)
+    np.maximum.at(best, file_idx, scores)
 
     # 5) Sort files by score descending
-    sorted_files: List[Tuple[str, float]] = sorted(
-        best_by_file.items(),
-        key=lambda x: x[1],
-        reverse=True,
-    )
-
-    # 6) Bucket into categories
-    buckets: Dict[str, List[Tuple[str, float]]] = {
-        "highly_relevant": [],
-        "partially_relevant": [],
-        "less_relevant": [],
-        "not_relevant": [],
-    }
-
-    for fname, score in sorted_files:
-        cat = map_score_to_category(score)
-        buckets[cat].append((fname, score))
+    order = np.argsort(-best, kind="stable")
+
+    # 6) Bucket into categories (one searchsorted for all files)
+    buckets: Dict[str, List[Tuple[str, float]]] = {cat: [] for cat in reversed(CATEGORIES)}
+    bucket_idx = np.searchsorted(CATEGORY_THRESHOLDS, best, side="right")
+    for i in order:
+        buckets[CATEGORIES[bucket_idx[i]]].append((str(unique_files[i]), float(best[i])))
 
     # 7) Pretty-print results
     def print_bucket(title: str, key: str):
@@ -3,7 +3,7 @@ Debug script to check what chunks are being retrieved for a query
 and verify if audio chunks are included.
 """
 import sys
-from legal_assistant.llm.embeddings_client import EmbeddingClient
+from legal_assistant.llm.embeddings_client import get_embedding_client
 from legal_assistant.retrieval.vector_store import VectorStore
 
 def debug_retrieval(query_text: str, top_k: int = 100):
@@ -12,11 +12,11 @@ def debug_retrieval(query_text: str, top_k: int = 100):
     print(f"Query: {query_text[:200]}...")
     print(f"Top K: {top_k}\n")
     
-    embed_client = EmbeddingClient()
+    embed_client = get_embedding_client()
     store = VectorStore(db_path="data/index/embeddings.db")
     
     # Embed query
-    query_emb = embed_client.embed_texts([query_text])[0]
+    query_emb = embed_client.embed_one(query_text)
     
     # Retrieve
     retrieved = store.query_by_embedding(query_emb, top_k=top_k)
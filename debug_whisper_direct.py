@@ -1,9 +1,10 @@
 """Debug what Whisper is actually doing."""
 import os
 import tempfile
-import whisper
 import traceback
 
+from legal_assistant.utils.universal_extraction import get_whisper_model
+
 # Create a valid temp audio file
 tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
 tmp_path = tmp_file.name
@@ -16,22 +17,24 @@ print(f"Temp file: {tmp_path}")
 print(f"Exists: {os.path.exists(tmp_path)}")
 print(f"Size: {os.path.getsize(tmp_path)}")
 
-print("\nLoading Whisper model...")
-model = whisper.load_model("base")
-print("Model loaded")
-
-print("\nAttempting transcription...")
 try:
-    result = model.transcribe(tmp_path)
-    print(f"Success! Text: {result['text'][:100]}")
-except Exception as e:
-    print(f"ERROR: {e}")
-    print(f"Error type: {type(e).__name__}")
-    print("\nFull traceback:")
-    traceback.print_exc()
+    # Same shared model the extraction code uses (loaded once per process)
+    print("\nLoading Whisper model...")
+    model = get_whisper_model("base")
+    print("Model loaded")
 
-# Cleanup
-try:
-    os.unlink(tmp_path)
-except:
-    pass
+    print("\nAttempting transcription...")
+    try:
+        result = model.transcribe(tmp_path)
+        print(f"Success! Text: {result['text'][:100]}")
+    except Exception as e:
+        print(f"ERROR: {e}")
+        print(f"Error type: {type(e).__name__}")
+        print("\nFull traceback:")
+        traceback.print_exc()
+finally:
+    # Cleanup, even if loading the model fails
+    try:
+        os.unlink(tmp_path)
+    except OSError:
+        pass
@@ -1,66 +1,105 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
 
-from legal_assistant.llm.embeddings_client import EmbeddingClient
+from legal_assistant.llm.embeddings_client import get_embedding_client
+from legal_assistant.retrieval.chunk_batcher import ChunkBatcher
 from legal_assistant.retrieval.vector_store import VectorStore
 from legal_assistant.utils.chunking import chunk_text
 from legal_assistant.utils.pdf_extraction import extract_text_from_pdf
 
 
+def extract_pdfs_parallel(
+    pdf_files: List[Path], max_workers: Optional[int] = None
+) -> Iterator[Tuple[Path, Optional[str]]]:
+    """
+    Yield (pdf_file, text) in completion order, extracting in worker processes
+    (PDF parsing is pure Python and CPU-bound). At most 2 * max_workers files
+    are in flight, so extracted text doesn't pile up ahead of the embedder.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    pending_files = iter(pdf_files)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        in_flight = {}
+        while True:
+            while len(in_flight) < 2 * max_workers:
+                pdf_file = next(pending_files, None)
+                if pdf_file is None:
+                    break
+                in_flight[pool.submit(extract_text_from_pdf, pdf_file)] = pdf_file
+            if not in_flight:
+                return
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                pdf_file = in_flight.pop(future)
+                try:
+                    text = future.result()
+                except Exception as e:
+                    print(f"[ERROR] Extraction failed for {pdf_file.name}: {e}")
+                    text = None
+                yield pdf_file, text
+
+
 def ingest_pdf_corpus(
     raw_dir: str = "data/raw_corpus",
     db_path: str = "data/index/embeddings.db",
     max_words: int = 200,
     overlap: int = 50,
+    max_workers: Optional[int] = None,
 ) -> None:
     raw_path = Path(raw_dir)
     if not raw_path.exists():
         print(f"[WARN] Raw corpus directory does not exist: {raw_path}")
         return
 
-    embed_client = EmbeddingClient()
+    embed_client = get_embedding_client()
     store = VectorStore(db_path=db_path)
+    # Chunks from many small files share embedding calls
+    batcher = ChunkBatcher(embed_client, store)
 
     total_files = 0
     total_chunks = 0
 
-    for pdf_file in raw_path.glob("*.pdf"):
-        total_files += 1
-        print(f"\n[INFO] Processing PDF file: {pdf_file.name}")
-
-        text = extract_text_from_pdf(pdf_file)
-        if not text:
-            print(f"[WARN] Skipping {pdf_file.name} (no text extracted).")
-            continue
-
-        chunks = chunk_text(text, max_words=max_words, overlap=overlap)
-        if not chunks:
-            print(f"[WARN] No chunks created for {pdf_file.name}")
-            continue
-
-        ids = []
-        metadatas = []
-        for i, _ in enumerate(chunks):
-            chunk_id = f"{pdf_file.stem}_chunk_{i}"
-            ids.append(chunk_id)
-            metadatas.append(
-                {
-                    "source_file": pdf_file.name,
-                    "chunk_index": i,
-                    "source_type": "pdf",
-                }
-            )
-
-        print(f"[INFO] File {pdf_file.name}: {len(chunks)} chunks")
-
-        embeddings = embed_client.embed_texts(chunks)
-        store.add_embeddings(
-            ids=ids,
-            embeddings=embeddings,
-            documents=chunks,
-            metadatas=metadatas,
-        )
-
-        total_chunks += len(chunks)
+    pdf_files = list(raw_path.glob("*.pdf"))
+
+    # One transaction for the whole run instead of a commit per batch
+    with store.bulk():
+        # Files are chunked and embedded here as the extraction workers finish
+        for pdf_file, text in extract_pdfs_parallel(pdf_files, max_workers):
+            total_files += 1
+            print(f"\n[INFO] Processing PDF file: {pdf_file.name}")
+
+            if not text:
+                print(f"[WARN] Skipping {pdf_file.name} (no text extracted).")
+                continue
+
+            chunks = chunk_text(text, max_words=max_words, overlap=overlap)
+            if not chunks:
+                print(f"[WARN] No chunks created for {pdf_file.name}")
+                continue
+
+            ids = []
+            metadatas = []
+            for i, _ in enumerate(chunks):
+                chunk_id = f"{pdf_file.stem}_chunk_{i}"
+                ids.append(chunk_id)
+                metadatas.append(
+                    {
+                        "source_file": pdf_file.name,
+                        "chunk_index": i,
+                        "source_type": "pdf",
+                    }
+                )
+
+            print(f"[INFO] File {pdf_file.name}: {len(chunks)} chunks")
+
+            batcher.add(ids, chunks, metadatas)
+
+            total_chunks += len(chunks)
+
+        batcher.flush()
 
     print("\n[DONE] PDF ingestion complete.")
     print(f"  Total PDF files processed: {total_files}")
@@ -1,6 +1,7 @@
 from pathlib import Path
 
-from legal_assistant.llm.embeddings_client import EmbeddingClient
+from legal_assistant.llm.embeddings_client import get_embedding_client
+from legal_assistant.retrieval.chunk_batcher import ChunkBatcher
 from legal_assistant.retrieval.vector_store import VectorStore
 from legal_assistant.utils.chunking import chunk_text
 
@@ -16,51 +17,50 @@ def ingest_txt_corpus(
         print(f"[WARN] Raw corpus directory does not exist: {raw_path}")
         return
 
-    embed_client = EmbeddingClient()
+    embed_client = get_embedding_client()
     store = VectorStore(db_path=db_path)
+    # Chunks from many small files share embedding calls
+    batcher = ChunkBatcher(embed_client, store)
 
     total_files = 0
     total_chunks = 0
 
-    for txt_file in raw_path.glob("*.txt"):
-        total_files += 1
-        print(f"\n[INFO] Processing file: {txt_file.name}")
-
-        try:
-            text = txt_file.read_text(encoding="utf-8", errors="ignore")
-        except Exception as e:
-            print(f"[ERROR] Failed to read {txt_file}: {e}")
-            continue
-
-        chunks = chunk_text(text, max_words=max_words, overlap=overlap)
-        if not chunks:
-            print(f"[WARN] No text/chunks extracted from {txt_file.name}")
-            continue
-
-        ids = []
-        metadatas = []
-        for i, _ in enumerate(chunks):
-            chunk_id = f"{txt_file.stem}_chunk_{i}"
-            ids.append(chunk_id)
-            metadatas.append(
-                {
-                    "source_file": txt_file.name,
-                    "chunk_index": i,
-                }
-            )
-
-        print(f"[INFO] File {txt_file.name}: {len(chunks)} chunks")
-
-        # Embed and store
-        embeddings = embed_client.embed_texts(chunks)
-        store.add_embeddings(
-            ids=ids,
-            embeddings=embeddings,
-            documents=chunks,
-            metadatas=metadatas,
-        )
-
-        total_chunks += len(chunks)
+    # One transaction for the whole run instead of a commit per batch
+    with store.bulk():
+        for txt_file in raw_path.glob("*.txt"):
+            total_files += 1
+            print(f"\n[INFO] Processing file: {txt_file.name}")
+
+            try:
+                text = txt_file.read_text(encoding="utf-8", errors="ignore")
+            except Exception as e:
+                print(f"[ERROR] Failed to read {txt_file}: {e}")
+                continue
+
+            chunks = chunk_text(text, max_words=max_words, overlap=overlap)
+            if not chunks:
+                print(f"[WARN] No text/chunks extracted from {txt_file.name}")
+                continue
+
+            ids = []
+            metadatas = []
+            for i, _ in enumerate(chunks):
+                chunk_id = f"{txt_file.stem}_chunk_{i}"
+                ids.append(chunk_id)
+                metadatas.append(
+                    {
+                        "source_file": txt_file.name,
+                        "chunk_index": i,
+                    }
+                )
+
+            print(f"[INFO] File {txt_file.name}: {len(chunks)} chunks")
+
+            batcher.add(ids, chunks, metadatas)
+
+            total_chunks += len(chunks)
+
+        batcher.flush()
 
     print("\n[DONE] Ingestion complete.")
     print(f"  Total files processed: {total_files}")
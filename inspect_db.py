@@ -1,7 +1,7 @@
-import sqlite3
+from legal_assistant.retrieval.vector_store import open_ro
 
 db_path = r"C:\Users\AashrithReddyVootkur\Documents\legal-assistant\data\index\embeddings.db"
-conn = sqlite3.connect(db_path)
+conn = open_ro(db_path)
 cursor = conn.cursor()
 
 # Get all tables
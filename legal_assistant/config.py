@@ -1,5 +1,6 @@
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 from dotenv import load_dotenv
 
 # Load variables from .env into environment
@@ -80,12 +81,7 @@ class Settings:
         )
 
 
-# Simple singleton-style accessor so we don't reload .env everywhere
-_settings: Settings | None = None
-
-
+# Singleton accessor so we don't re-read env / re-validate on every call
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    global _settings
-    if _settings is None:
-        _settings = Settings.from_env()
-    return _settings
+    return Settings.from_env()
@@ -1,22 +1,38 @@
 # legal_assistant/db.py
 import os
+from functools import lru_cache
+from typing import Callable, TypeVar
 from urllib.parse import quote_plus
 
 from sqlalchemy import create_engine
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError, OperationalError
 
-_engine: Engine | None = None
+from legal_assistant.utils.logging_setup import get_logger
 
+logger = get_logger("db")
 
+T = TypeVar("T")
+
+
+@lru_cache(maxsize=1)
 def get_engine() -> Engine:
     """
     Lazily create and cache a single SQLAlchemy engine for SQL Server.
     We take a raw ODBC connection string from the environment and URL-encode it.
-    """
-    global _engine
-    if _engine is not None:
-        return _engine
 
+    fast_executemany lets pyodbc send executemany() batches (e.g. all relevance
+    decisions for one request) as a single bulk parameter array.
+
+    The pool is sized for the relevance check, which runs its per-file cache
+    lookups concurrently from worker threads (DB_POOL_SIZE, default 10).
+
+    Connections aren't pinged on every checkout (that is an extra round trip
+    per query); instead they are recycled before SQL Server / Azure SQL drops
+    them as idle (DB_POOL_RECYCLE seconds, default 1800). Connections killed
+    sooner (server restart, failover, a shorter firewall idle timeout) are
+    handled by run_in_transaction, which retries once on a fresh connection.
+    """
     raw_odbc = os.getenv("SQLSERVER_ODBC_STRING")
     if not raw_odbc:
         raise RuntimeError(
@@ -28,5 +44,31 @@ def get_engine() -> Engine:
     encoded = quote_plus(raw_odbc)
     conn_url = f"mssql+pyodbc:///?odbc_connect={encoded}"
 
-    _engine = create_engine(conn_url, pool_pre_ping=True)
-    return _engine
+    return create_engine(
+        conn_url,
+        pool_pre_ping=False,
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+        max_overflow=10,
+        fast_executemany=True,
+    )
+
+
+def run_in_transaction(engine: Engine, work: Callable[[Connection], T]) -> T:
+    """
+    Run work(conn) in a transaction on engine. If it fails because the pooled
+    connection was dead, the pool is disposed and work runs once more on a new
+    connection. The failed transaction never committed, so work must only be
+    safe to run again (all callers upsert, or delete then insert).
+    """
+    try:
+        with engine.begin() as conn:
+            return work(conn)
+    except DBAPIError as e:
+        if not (e.connection_invalidated or isinstance(e, OperationalError)):
+            raise
+        logger.warning("SQL Server connection lost, retrying on a new connection: %s", e)
+        engine.dispose()
+
+    with engine.begin() as conn:
+        return work(conn)
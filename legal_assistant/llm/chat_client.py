@@ -1,6 +1,30 @@
+import threading
+from typing import Optional
+
 from openai import AzureOpenAI
 
 from legal_assistant.config import get_settings
+from legal_assistant.utils.logging_setup import get_logger
+
+logger = get_logger("chat_client")
+
+_client: Optional["ChatClient"] = None
+_client_lock = threading.Lock()
+
+
+def log_prompt_cache_usage(completion, label: str) -> None:
+    """
+    Log how many prompt tokens Azure served from its prompt cache, so the
+    hit rate of the static prompt prefixes is observable.
+    """
+    usage = getattr(completion, "usage", None)
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", None)
+    if cached_tokens is not None:
+        logger.debug(
+            "%s prompt: %s/%s prompt tokens served from cache",
+            label, cached_tokens, usage.prompt_tokens,
+        )
 
 
 class ChatClient:
@@ -34,5 +58,21 @@ class ChatClient:
             ],
             temperature=0.2,
         )
+
+        log_prompt_cache_usage(response, "Chat")
+
         # New OpenAI client returns .message.content
         return response.choices[0].message.content
+
+
+def get_chat_client() -> ChatClient:
+    """
+    Process-wide ChatClient, created on first use, so callers share one
+    AzureOpenAI client and its connection pool.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = ChatClient()
+    return _client
@@ -1,8 +1,23 @@
-from typing import List
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 import cohere
 
 from legal_assistant.config import get_settings
 
+# Cohere's embed endpoint accepts at most this many texts per request
+MAX_TEXTS_PER_CALL = 96
+
+# Single-text embeddings (queries, criteria) kept in process, keyed by
+# (model, text), so repeating a query doesn't cost another API call
+EMBED_ONE_CACHE_SIZE = 4096
+
+_one_cache: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+_one_cache_lock = threading.Lock()
+
+_client: Optional["EmbeddingClient"] = None
+_client_lock = threading.Lock()
+
 
 class EmbeddingClient:
     def __init__(self) -> None:
@@ -13,18 +28,65 @@ class EmbeddingClient:
         self.client = cohere.Client(settings.cohere_api_key)
         self.model = settings.cohere_embedding_model
 
-    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+    def embed_texts(self, texts: List[str], batch_size: int = MAX_TEXTS_PER_CALL) -> List[List[float]]:
         """
         Given a list of texts, return a list of embedding vectors using Cohere.
+        Longer lists are sent in requests of batch_size texts (at most
+        MAX_TEXTS_PER_CALL). Repeated texts (signatures, disclaimers) are
+        sent once and their embedding is reused.
         """
         if not texts:
             return []
 
-        response = self.client.embed(
-            model=self.model,
-            texts=texts,
-            input_type="search_document",
-        )
+        # Position of each distinct text in unique
+        slot: Dict[str, int] = {}
+        unique: List[str] = []
+        for text in texts:
+            if text not in slot:
+                slot[text] = len(unique)
+                unique.append(text)
+
+        batch_size = max(1, min(batch_size, MAX_TEXTS_PER_CALL))
+        embeddings: List[List[float]] = []
+        for start in range(0, len(unique), batch_size):
+            response = self.client.embed(
+                model=self.model,
+                texts=unique[start:start + batch_size],
+                input_type="search_document",
+            )
+            # Cohere returns embeddings as a list of lists
+            embeddings.extend(response.embeddings)
+        return [embeddings[slot[text]] for text in texts]
+
+    def embed_one(self, text: str) -> List[float]:
+        """
+        Embed a single text, reusing the in-process cache when the same text
+        was embedded before with this model.
+        """
+        key = (self.model, text)
+        with _one_cache_lock:
+            cached = _one_cache.get(key)
+            if cached is not None:
+                _one_cache.move_to_end(key)
+                return cached
+
+        vector = self.embed_texts([text])[0]
+
+        with _one_cache_lock:
+            _one_cache[key] = vector
+            if len(_one_cache) > EMBED_ONE_CACHE_SIZE:
+                _one_cache.popitem(last=False)
+        return vector
+
 
-        # Cohere returns embeddings as a list of lists
-        return response.embeddings
+def get_embedding_client() -> EmbeddingClient:
+    """
+    Process-wide EmbeddingClient, created on first use. Sharing it keeps one
+    Cohere session (and its connection pool) instead of one per caller.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = EmbeddingClient()
+    return _client
@@ -2,7 +2,7 @@ from typing import Optional
 import logging
 
 from legal_assistant.config import get_settings
-from legal_assistant.llm.chat_client import ChatClient
+from legal_assistant.llm.chat_client import get_chat_client
 
 log = logging.getLogger(__name__)
 
@@ -18,7 +18,7 @@ class ModelSelector:
 
     def __init__(self) -> None:
         self.settings = get_settings()
-        self.openai = ChatClient()
+        self.openai = get_chat_client()
 
         # Try to lazily import Anthropic (optional dependency)
         self.anthropic_client = None
@@ -0,0 +1,289 @@
+# legal_assistant/relevance_cache.py
+"""
+Cache of LLM relevance verdicts in SQL Server (dbo.RelevanceCache).
+
+Exact hits are keyed by sha256(model + criteria + document text).
+Near-duplicates (forwarded emails, small edits) are matched by cosine
+similarity of the document embedding among entries for the same model and
+criteria.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Union
+
+import numpy as np
+from sqlalchemy import text
+
+from legal_assistant.db import get_engine, run_in_transaction
+from legal_assistant.utils.fast_json import dumps as json_dumps, loads as json_loads
+from legal_assistant.utils.logging_setup import get_logger
+
+logger = get_logger("relevance_cache")
+
+# Entries older than this are ignored and eventually pruned
+CACHE_TTL_HOURS = 24
+# Keep at most this many rows (least recently hit are dropped first)
+CACHE_MAX_ROWS = 10000
+# Minimum cosine similarity for a near-duplicate document to count as a hit
+SEMANTIC_HIT_THRESHOLD = 0.92
+# Document embeddings kept in process (float16, keyed by sha256 of the text)
+EMBEDDING_LRU_SIZE = 1024
+
+_table_ready = False
+
+_embedding_lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+_embedding_lru_lock = threading.Lock()
+
+
+def _ensure_table() -> None:
+    """
+    Make sure dbo.RelevanceCache exists.
+    """
+    global _table_ready
+    if _table_ready:
+        return
+
+    ddl = """
+    IF NOT EXISTS (
+        SELECT * FROM sys.objects
+        WHERE name = 'RelevanceCache' AND type = 'U'
+    )
+    BEGIN
+        CREATE TABLE dbo.RelevanceCache (
+            CacheKey CHAR(64) NOT NULL PRIMARY KEY,
+            CriteriaHash CHAR(64) NOT NULL,
+            Category NVARCHAR(32) NOT NULL,
+            Summary NVARCHAR(MAX) NULL,
+            Reason NVARCHAR(MAX) NULL,
+            Snippets NVARCHAR(MAX) NULL,   -- JSON array of strings
+            Embedding VARBINARY(MAX) NULL, -- float32 document embedding
+            CreatedAt DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+            LastHitAt DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME()
+        );
+        CREATE INDEX IX_RelevanceCache_Criteria
+            ON dbo.RelevanceCache (CriteriaHash, CreatedAt);
+    END;
+    """
+    run_in_transaction(get_engine(), lambda conn: conn.exec_driver_sql(ddl))
+    _table_ready = True
+
+
+def hash_text(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def make_cache_key(model_name: str, criteria: str, document_text: str) -> str:
+    """Exact-match key for a (model, criteria, document) triple."""
+    return hash_text(model_name + "\x1f" + criteria + "\x1f" + document_text)
+
+
+def get_document_embedding(embed_client, document_text: str) -> np.ndarray:
+    """
+    Embed a document for the near-duplicate lookup, reusing the in-process
+    LRU so the same text checked against different criteria (or again later
+    in the session) doesn't cost another embedding call.
+    """
+    key = hash_text(document_text)
+    with _embedding_lru_lock:
+        cached = _embedding_lru.get(key)
+        if cached is not None:
+            _embedding_lru.move_to_end(key)
+            return cached
+
+    # float16 halves the memory per entry; similarity is computed in float32
+    vector = np.asarray(embed_client.embed_texts([document_text])[0], dtype=np.float16)
+
+    with _embedding_lru_lock:
+        _embedding_lru[key] = vector
+        if len(_embedding_lru) > EMBEDDING_LRU_SIZE:
+            _embedding_lru.popitem(last=False)
+    return vector
+
+
+def _row_to_verdict(category, summary, reason, snippets_json) -> Dict[str, Any]:
+    try:
+        snippets = json_loads(snippets_json) if snippets_json else []
+    except Exception:
+        snippets = []
+    return {
+        "category": category,
+        "summary": summary or "",
+        "reason": reason or "",
+        "snippets": snippets,
+    }
+
+
+def get_cached_verdict(cache_key: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the cached verdict for an exact key, or None on miss / error.
+    """
+    try:
+        _ensure_table()
+
+        def lookup(conn):
+            row = conn.execute(
+                text(
+                    """
+                    SELECT Category, Summary, Reason, Snippets
+                    FROM dbo.RelevanceCache
+                    WHERE CacheKey = :key
+                      AND CreatedAt > DATEADD(hour, -:ttl, SYSUTCDATETIME())
+                    """
+                ),
+                {"key": cache_key, "ttl": CACHE_TTL_HOURS},
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    text("UPDATE dbo.RelevanceCache SET LastHitAt = SYSUTCDATETIME() WHERE CacheKey = :key"),
+                    {"key": cache_key},
+                )
+            return row
+
+        row = run_in_transaction(get_engine(), lookup)
+        if row is None:
+            return None
+        return _row_to_verdict(*row)
+    except Exception as e:
+        logger.warning("Relevance cache lookup failed: %s", e)
+        return None
+
+
+def find_similar_verdict(
+    criteria_hash: str,
+    embedding: Union[Sequence[float], np.ndarray],
+) -> Optional[Dict[str, Any]]:
+    """
+    Near-duplicate lookup: best cached verdict for the same criteria whose
+    document embedding has cosine similarity >= SEMANTIC_HIT_THRESHOLD.
+    """
+    try:
+        _ensure_table()
+        rows = run_in_transaction(
+            get_engine(),
+            lambda conn: conn.execute(
+                text(
+                    """
+                    SELECT CacheKey, Embedding, Category, Summary, Reason, Snippets
+                    FROM dbo.RelevanceCache
+                    WHERE CriteriaHash = :criteria_hash
+                      AND Embedding IS NOT NULL
+                      AND CreatedAt > DATEADD(hour, -:ttl, SYSUTCDATETIME())
+                    """
+                ),
+                {"criteria_hash": criteria_hash, "ttl": CACHE_TTL_HOURS},
+            ).fetchall(),
+        )
+        if not rows:
+            return None
+
+        query = np.asarray(embedding, dtype=np.float32)
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0.0:
+            return None
+
+        matrix = np.vstack([np.frombuffer(r[1], dtype=np.float32) for r in rows])
+        norms = np.linalg.norm(matrix, axis=1)
+        norms[norms == 0.0] = 1.0
+        scores = (matrix @ query) / (norms * query_norm)
+
+        best = int(np.argmax(scores))
+        if scores[best] < SEMANTIC_HIT_THRESHOLD:
+            return None
+
+        cache_key, _emb, category, summary, reason, snippets = rows[best]
+        run_in_transaction(
+            get_engine(),
+            lambda conn: conn.execute(
+                text("UPDATE dbo.RelevanceCache SET LastHitAt = SYSUTCDATETIME() WHERE CacheKey = :key"),
+                {"key": cache_key},
+            ),
+        )
+        return _row_to_verdict(category, summary, reason, snippets)
+    except Exception as e:
+        logger.warning("Semantic relevance cache lookup failed: %s", e)
+        return None
+
+
+def store_verdict(
+    cache_key: str,
+    criteria_hash: str,
+    verdict: Dict[str, Any],
+    embedding: Optional[Union[Sequence[float], np.ndarray]] = None,
+) -> None:
+    """
+    Insert (or refresh) a verdict for a cache key.
+    """
+    try:
+        _ensure_table()
+        emb_bytes = (
+            np.asarray(embedding, dtype=np.float32).tobytes()
+            if embedding is not None
+            else None
+        )
+
+        def store(conn):
+            conn.execute(
+                text("DELETE FROM dbo.RelevanceCache WHERE CacheKey = :key"),
+                {"key": cache_key},
+            )
+            conn.execute(
+                text(
+                    """
+                    INSERT INTO dbo.RelevanceCache
+                        (CacheKey, CriteriaHash, Category, Summary, Reason, Snippets, Embedding)
+                    VALUES
+                        (:key, :criteria_hash, :category, :summary, :reason, :snippets, :embedding)
+                    """
+                ),
+                {
+                    "key": cache_key,
+                    "criteria_hash": criteria_hash,
+                    "category": verdict.get("category", ""),
+                    "summary": verdict.get("summary", ""),
+                    "reason": verdict.get("reason", ""),
+                    "snippets": json_dumps(verdict.get("snippets") or []),
+                    "embedding": emb_bytes,
+                },
+            )
+
+        run_in_transaction(get_engine(), store)
+    except Exception as e:
+        logger.warning("Failed to store relevance cache entry: %s", e)
+
+
+def prune_cache() -> None:
+    """
+    Drop expired entries and trim the table to CACHE_MAX_ROWS by LastHitAt.
+    """
+    try:
+        _ensure_table()
+
+        def prune(conn):
+            conn.execute(
+                text(
+                    """
+                    DELETE FROM dbo.RelevanceCache
+                    WHERE CreatedAt <= DATEADD(hour, -:ttl, SYSUTCDATETIME())
+                    """
+                ),
+                {"ttl": CACHE_TTL_HOURS},
+            )
+            conn.execute(
+                text(
+                    """
+                    DELETE FROM dbo.RelevanceCache
+                    WHERE CacheKey NOT IN (
+                        SELECT TOP (:cap) CacheKey
+                        FROM dbo.RelevanceCache
+                        ORDER BY LastHitAt DESC
+                    )
+                    """
+                ),
+                {"cap": CACHE_MAX_ROWS},
+            )
+
+        run_in_transaction(get_engine(), prune)
+    except Exception as e:
+        logger.warning("Failed to prune relevance cache: %s", e)
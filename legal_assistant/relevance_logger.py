@@ -3,11 +3,105 @@
 import os
 from typing import Optional
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import Integer, Unicode, UnicodeText, bindparam, create_engine, text
+
+from legal_assistant.db import run_in_transaction
+from legal_assistant.utils.logging_setup import get_logger
+
+logger = get_logger("relevance_logger")
 
 # Cache globals so we don't recreate engine every time
 _engine = None
 _conn_str: Optional[str] = None
+_table_ready = False
+
+# dbo.RelevanceDecisions keeps one row per (file, criteria). CriteriaHash is a
+# persisted SHA-256 of the criteria so the unique index stays narrow even
+# though Criteria is NVARCHAR(MAX). Run as separate batches: SQL Server
+# compiles a whole batch up front, so a column must exist before a later
+# statement can reference it.
+RELEVANCE_DECISIONS_DDL = (
+    """
+    IF NOT EXISTS (
+        SELECT * FROM sys.objects
+        WHERE name = 'RelevanceDecisions' AND type = 'U'
+    )
+    BEGIN
+        CREATE TABLE dbo.RelevanceDecisions (
+            Id INT IDENTITY(1,1) PRIMARY KEY,
+            FileName NVARCHAR(255) NOT NULL,
+            Criteria NVARCHAR(MAX) NULL,
+            EmailBody NVARCHAR(MAX) NULL,
+            RelevanceLabel TINYINT NOT NULL, -- 0 = non-relevant, 1 = relevant, 3 = failed
+            Citation NVARCHAR(MAX) NULL,
+            CreatedAt DATETIME2 NOT NULL DEFAULT SYSDATETIME()
+        );
+    END;
+    """,
+    """
+    IF COL_LENGTH('dbo.RelevanceDecisions', 'CriteriaHash') IS NULL
+        ALTER TABLE dbo.RelevanceDecisions
+            ADD CriteriaHash AS CAST(HASHBYTES('SHA2_256', ISNULL(Criteria, N'')) AS BINARY(32)) PERSISTED;
+    """,
+)
+
+# The unique index is only created on a table without repeated (file,
+# criteria) rows. Older tables can hold repeats; they are audit history, so
+# they are only deleted (newest row kept) when RELEVANCE_DEDUPE_DECISIONS=1.
+# Otherwise the index is skipped with a warning and MERGE still upserts.
+DEDUPE_DECISIONS = os.getenv("RELEVANCE_DEDUPE_DECISIONS", "0") == "1"
+
+UNIQUE_INDEX_EXISTS = """
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'UX_RelevanceDecisions_File_Criteria'
+      AND object_id = OBJECT_ID('dbo.RelevanceDecisions')
+"""
+
+_RANKED_DECISIONS = """
+    WITH ranked AS (
+        SELECT ROW_NUMBER() OVER (
+            PARTITION BY FileName, CriteriaHash ORDER BY Id DESC
+        ) AS rn
+        FROM dbo.RelevanceDecisions
+    )
+"""
+COUNT_DUPLICATE_DECISIONS = _RANKED_DECISIONS + "SELECT COUNT(*) FROM ranked WHERE rn > 1;"
+DELETE_DUPLICATE_DECISIONS = _RANKED_DECISIONS + "DELETE FROM ranked WHERE rn > 1;"
+
+CREATE_UNIQUE_INDEX = """
+    CREATE UNIQUE INDEX UX_RelevanceDecisions_File_Criteria
+        ON dbo.RelevanceDecisions (FileName, CriteriaHash);
+"""
+
+# Upsert: re-running the same file against the same criteria updates the
+# existing row instead of appending another one. Built once at import; the
+# parameters are typed so the SQL Server dialect passes their types to pyodbc
+# (setinputsizes) instead of pyodbc inferring them from the values of every
+# executemany batch.
+UPSERT_DECISION = text(
+    """
+    MERGE dbo.RelevanceDecisions WITH (HOLDLOCK) AS t
+    USING (VALUES (:file_name, :criteria, :email_body, :label, :citation))
+        AS s (FileName, Criteria, EmailBody, RelevanceLabel, Citation)
+    ON t.FileName = s.FileName
+       AND t.CriteriaHash = CAST(HASHBYTES('SHA2_256', ISNULL(CAST(s.Criteria AS NVARCHAR(MAX)), N'')) AS BINARY(32))
+    WHEN MATCHED THEN
+        UPDATE SET
+            EmailBody = s.EmailBody,
+            RelevanceLabel = s.RelevanceLabel,
+            Citation = s.Citation,
+            CreatedAt = SYSDATETIME()
+    WHEN NOT MATCHED THEN
+        INSERT (FileName, Criteria, EmailBody, RelevanceLabel, Citation)
+        VALUES (s.FileName, s.Criteria, s.EmailBody, s.RelevanceLabel, s.Citation);
+    """
+).bindparams(
+    bindparam("file_name", type_=Unicode(255)),
+    bindparam("criteria", type_=UnicodeText()),
+    bindparam("email_body", type_=UnicodeText()),
+    bindparam("label", type_=Integer()),
+    bindparam("citation", type_=UnicodeText()),
+)
 
 
 def _get_conn_str() -> str:
@@ -33,34 +127,52 @@ def _get_engine():
         return _engine
 
     conn_str = _get_conn_str()
-    _engine = create_engine(conn_str, pool_pre_ping=True)
+    # Same pool settings as db.get_engine: recycle instead of a ping per
+    # checkout, with run_in_transaction retrying once on a dropped connection
+    _engine = create_engine(
+        conn_str,
+        pool_pre_ping=False,
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    )
     return _engine
 
 
-def _ensure_table():
+def ensure_relevance_decisions_table(engine) -> None:
     """
-    Make sure dbo.RelevanceDecisions exists.
+    Create / upgrade dbo.RelevanceDecisions on the given engine.
     """
-    engine = _get_engine()
-    ddl = """
-    IF NOT EXISTS (
-        SELECT * FROM sys.objects
-        WHERE name = 'RelevanceDecisions' AND type = 'U'
-    )
-    BEGIN
-        CREATE TABLE dbo.RelevanceDecisions (
-            Id INT IDENTITY(1,1) PRIMARY KEY,
-            FileName NVARCHAR(255) NOT NULL,
-            Criteria NVARCHAR(MAX) NULL,
-            EmailBody NVARCHAR(MAX) NULL,
-            RelevanceLabel TINYINT NOT NULL, -- 0 = non-relevant, 1 = relevant, 3 = failed
-            Citation NVARCHAR(MAX) NULL,
-            CreatedAt DATETIME2 NOT NULL DEFAULT SYSDATETIME()
-        );
-    END;
+    def create(conn):
+        for statement in RELEVANCE_DECISIONS_DDL:
+            conn.exec_driver_sql(statement)
+        if conn.exec_driver_sql(UNIQUE_INDEX_EXISTS).first() is not None:
+            return
+
+        duplicates = conn.exec_driver_sql(COUNT_DUPLICATE_DECISIONS).scalar()
+        if duplicates:
+            if not DEDUPE_DECISIONS:
+                logger.warning(
+                    "dbo.RelevanceDecisions has %s repeated file + criteria rows; "
+                    "not creating UX_RelevanceDecisions_File_Criteria. Set RELEVANCE_DEDUPE_DECISIONS=1 "
+                    "to delete them (the newest row per file + criteria is kept).",
+                    duplicates,
+                )
+                return
+            conn.exec_driver_sql(DELETE_DUPLICATE_DECISIONS)
+            logger.info("Deleted %s older repeated rows from dbo.RelevanceDecisions", duplicates)
+        conn.exec_driver_sql(CREATE_UNIQUE_INDEX)
+
+    run_in_transaction(engine, create)
+
+
+def _ensure_table():
     """
-    with engine.begin() as conn:
-        conn.exec_driver_sql(ddl)
+    Make sure dbo.RelevanceDecisions exists (once per process).
+    """
+    global _table_ready
+    if _table_ready:
+        return
+    ensure_relevance_decisions_table(_get_engine())
+    _table_ready = True
 
 
 def log_relevance_decision(
@@ -78,16 +190,10 @@ def log_relevance_decision(
         _ensure_table()
         engine = _get_engine()
 
-        with engine.begin() as conn:
-            conn.execute(
-                text(
-                    """
-                    INSERT INTO dbo.RelevanceDecisions
-                        (FileName, Criteria, EmailBody, RelevanceLabel, Citation)
-                    VALUES
-                        (:file_name, :criteria, :email_body, :label, :citation)
-                    """
-                ),
+        run_in_transaction(
+            engine,
+            lambda conn: conn.execute(
+                UPSERT_DECISION,
                 {
                     "file_name": file_name,
                     "criteria": criteria,
@@ -95,9 +201,10 @@ def log_relevance_decision(
                     "label": int(label),
                     "citation": citation,
                 },
-            )
+            ),
+        )
     except Exception as e:
-        print(f"[WARN] Failed to log relevance decision for {file_name}: {e}")
+        logger.warning("Failed to log relevance decision for %s: %s", file_name, e)
 
 
 def log_llm_error(
@@ -118,4 +225,4 @@ def log_llm_error(
             citation=f"LLM error: {error_message}",
         )
     except Exception as e:
-        print(f"[WARN] Failed to log LLM error for {file_name}: {e}")
+        logger.warning("Failed to log LLM error for %s: %s", file_name, e)
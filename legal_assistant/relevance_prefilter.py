@@ -0,0 +1,90 @@
+# legal_assistant/relevance_prefilter.py
+"""
+Cheap keyword prefilter for the relevance check.
+
+The criteria text is reduced to a set of term stems which are compiled once
+into a single regex. A document that mentions fewer than PREFILTER_MIN_HITS
+distinct stems is marked not_relevant without calling the LLM.
+
+Documents that pass the keyword check can also be screened by embedding:
+one whose cosine similarity to the criteria is below PREFILTER_MIN_SIMILARITY
+is marked not_relevant the same way.
+"""
+
+import os
+import re
+from typing import Optional, Pattern, Sequence, Set, Union
+
+import numpy as np
+
+# Distinct criteria terms a document must mention to be sent to the LLM
+# (0 disables the prefilter)
+PREFILTER_MIN_HITS = int(os.getenv("RELEVANCE_PREFILTER_MIN_HITS", "2"))
+
+# Minimum criteria/document embedding similarity to be sent to the LLM
+# (0 disables the embedding screen)
+PREFILTER_MIN_SIMILARITY = float(os.getenv("RELEVANCE_PREFILTER_MIN_SIMILARITY", "0.15"))
+
+# Terms are cut to this many chars so "harassment" also matches "harassed"
+STEM_LENGTH = 6
+
+_TERM_RE = re.compile(r"\w{4,}")
+
+_STOPWORDS = {
+    "about", "after", "also", "been", "before", "being", "between", "both",
+    "case", "concerning", "could", "does", "document", "documents", "each",
+    "email", "emails", "file", "files", "from", "have", "including",
+    "information", "into", "matter", "more", "must", "only", "other", "over",
+    "regarding", "related", "relevant", "same", "shall", "should", "some",
+    "such", "than", "that", "their", "them", "then", "there", "these", "they",
+    "this", "those", "under", "were", "what", "when", "where", "which",
+    "while", "will", "with", "within", "would",
+}
+
+
+def criteria_stems(criteria: str) -> Set[str]:
+    """Distinct term stems of the criteria text, minus stopwords."""
+    return {
+        term[:STEM_LENGTH]
+        for term in _TERM_RE.findall(criteria.lower())
+        if term not in _STOPWORDS and not term.isdigit()
+    }
+
+
+def build_criteria_pattern(stems: Set[str]) -> Optional[Pattern[str]]:
+    """
+    Compile the stems into one case-insensitive regex, or None if there are
+    no stems to match.
+    """
+    if not stems:
+        return None
+
+    # Longest first so the alternation prefers the most specific stem
+    alternation = "|".join(re.escape(s) for s in sorted(stems, key=len, reverse=True))
+    return re.compile(rf"\b(?:{alternation})", re.IGNORECASE)
+
+
+def count_criteria_hits(pattern: Pattern[str], text: str, stop_at: Optional[int] = None) -> int:
+    """
+    Number of distinct criteria stems that occur in text. With stop_at, the
+    scan ends as soon as that many distinct stems were seen.
+    """
+    seen: Set[str] = set()
+    for m in pattern.finditer(text):
+        seen.add(m.group().lower())
+        if stop_at is not None and len(seen) >= stop_at:
+            break
+    return len(seen)
+
+
+def cosine_similarity(
+    a: Union[Sequence[float], np.ndarray],
+    b: Union[Sequence[float], np.ndarray],
+) -> float:
+    """Cosine similarity of two embeddings (0.0 if either is all zeros)."""
+    va = np.asarray(a, dtype=np.float32)
+    vb = np.asarray(b, dtype=np.float32)
+    denom = float(np.linalg.norm(va) * np.linalg.norm(vb))
+    if denom == 0.0:
+        return 0.0
+    return float(va @ vb) / denom
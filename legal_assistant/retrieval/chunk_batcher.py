@@ -0,0 +1,115 @@
+import hashlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from legal_assistant.llm.embeddings_client import MAX_TEXTS_PER_CALL, EmbeddingClient
+from legal_assistant.retrieval.vector_store import VectorStore
+
+
+class ChunkBatcher:
+    """
+    Collects chunks across files and embeds + stores them in full batches.
+
+    Corpus ingestion used to make one embedding call per file, so a folder of
+    short emails paid one round trip per email for a handful of chunks each.
+    Chunks are now buffered and flushed batch_size at a time; call flush()
+    after the last file.
+
+    Chunks whose text was embedded before (by the same model) are served from
+    the store's embeddings_cache, so only new or changed chunks are embedded.
+
+    Embedding calls run on a background thread, up to pipeline_depth batches
+    ahead, so the caller keeps extracting and chunking the next files while a
+    batch is embedded. Finished batches are written from the caller's thread
+    (SQLite connections, including the store's bulk() one, are per-thread).
+    """
+
+    def __init__(
+        self,
+        embed_client: EmbeddingClient,
+        store: VectorStore,
+        batch_size: int = MAX_TEXTS_PER_CALL,
+        pipeline_depth: int = 2,
+    ) -> None:
+        self.embed_client = embed_client
+        self.store = store
+        self.batch_size = batch_size
+        self.pipeline_depth = pipeline_depth
+        self._ids: List[str] = []
+        self._documents: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Submitted batches, oldest first, waiting to be written
+        self._pending: Deque[Tuple[Optional[Future], "_Batch"]] = deque()
+
+    def add(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        self._ids.extend(ids)
+        self._documents.extend(documents)
+        self._metadatas.extend(metadatas)
+        while len(self._ids) >= self.batch_size:
+            self._flush_batch(self.batch_size)
+
+    def flush(self) -> None:
+        """Embed and store whatever is still buffered or in flight."""
+        while self._ids:
+            self._flush_batch(self.batch_size)
+        while self._pending:
+            self._write_oldest()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _flush_batch(self, size: int) -> None:
+        batch = _Batch(self._ids[:size], self._documents[:size], self._metadatas[:size])
+        del self._ids[:size], self._documents[:size], self._metadatas[:size]
+
+        # Cache lookups stay on this thread; only the API call is handed off
+        model = self.embed_client.model
+        batch.hashes = [
+            hashlib.sha256(f"{model}\x1f{doc}".encode("utf-8")).hexdigest()
+            for doc in batch.documents
+        ]
+        batch.cached = self.store.get_cached_embeddings(batch.hashes)
+        batch.misses = [i for i, h in enumerate(batch.hashes) if h not in batch.cached]
+
+        future = None
+        if batch.misses:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed")
+            future = self._executor.submit(
+                self.embed_client.embed_texts, [batch.documents[i] for i in batch.misses]
+            )
+        self._pending.append((future, batch))
+        while len(self._pending) > self.pipeline_depth:
+            self._write_oldest()
+
+    def _write_oldest(self) -> None:
+        future, batch = self._pending.popleft()
+        fresh = future.result() if future is not None else []
+
+        new_rows = []
+        for i, vec in zip(batch.misses, fresh):
+            batch.cached[batch.hashes[i]] = vec
+            new_rows.append((batch.hashes[i], vec))
+        self.store.cache_embeddings(self.embed_client.model, new_rows)
+
+        self.store.add_embeddings(
+            ids=batch.ids,
+            embeddings=[batch.cached[h] for h in batch.hashes],
+            documents=batch.documents,
+            metadatas=batch.metadatas,
+        )
+
+
+@dataclass
+class _Batch:
+    """One batch of chunks on its way through ChunkBatcher."""
+    ids: List[str]
+    documents: List[str]
+    metadatas: List[Dict[str, Any]]
+    hashes: List[str] = field(default_factory=list)
+    cached: Dict[str, List[float]] = field(default_factory=dict)
+    # Positions in documents that weren't in the embeddings cache
+    misses: List[int] = field(default_factory=list)
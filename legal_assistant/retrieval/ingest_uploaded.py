@@ -1,85 +1,151 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Tuple, Dict, Any
+from typing import List, Optional, Tuple, Dict, Any
 
-from legal_assistant.llm.embeddings_client import EmbeddingClient
+from legal_assistant.llm.embeddings_client import get_embedding_client
+from legal_assistant.retrieval.chunk_batcher import ChunkBatcher
 from legal_assistant.retrieval.vector_store import VectorStore
 from legal_assistant.utils.chunking import chunk_text
-from legal_assistant.utils.universal_extraction import extract_text_from_upload, ExtractedText
+from legal_assistant.utils.extract_cache import digest_source, get_or_extract
+from legal_assistant.utils.logging_setup import get_logger
+from legal_assistant.utils.universal_extraction import DocumentSource, ExtractedText
+
+logger = get_logger("ingest")
+
+# Files extracted at once
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "8"))
+
+
+def _prepare_upload(
+    filename: str,
+    data: DocumentSource,
+    digest: str,
+    max_words: int,
+    overlap: int,
+) -> Tuple[Optional[str], Dict[str, Any]]:
+    """
+    Extract and chunk one upload (runs on a worker thread). Returns
+    (failure reason, {}) or (None, the chunks to embed and store).
+    """
+    # Use universal extraction (cached by content hash)
+    extracted: ExtractedText = get_or_extract(filename, data, digest=digest)
+
+    # Check for extraction errors
+    if extracted.error:
+        logger.warning("Extraction error for %s: %s", filename, extracted.error)
+        return extracted.error, {}
+
+    text = extracted.text.strip()
+    if not text:
+        logger.warning("No text extracted from %s", filename)
+        return "empty extracted text", {}
+
+    # Chunk the text
+    chunks = chunk_text(text, max_words=max_words, overlap=overlap)
+
+    if not chunks:
+        logger.warning("No chunks created for %s", filename)
+        return "no chunks created", {}
+
+    # Build IDs and metadata
+    ids = []
+    metadatas = []
+    stem = Path(filename).stem
+
+    for i in range(len(chunks)):
+        ids.append(f"upload_{stem}_chunk_{i}")
+        metadatas.append({
+            "source_file": filename,
+            "chunk_index": i,
+            "source_type": extracted.source_type,
+            **extracted.meta,  # Include extraction metadata
+        })
+
+    return None, {
+        "ids": ids,
+        "documents": chunks,
+        "metadatas": metadatas,
+        "source_type": extracted.source_type,
+    }
 
 
 def ingest_uploaded_files_into_vector_store(
-    files: List[Tuple[str, bytes]],
+    files: List[Tuple[str, DocumentSource]],
     db_path: str = "data/index/embeddings.db",
     max_words: int = 200,
     overlap: int = 40,
+    skip_unchanged: bool = True,
 ) -> Dict[str, Any]:
     """
     Ingest uploaded files into the vector store using universal extraction.
+
+    With skip_unchanged, a file whose bytes hash to the same sha256 as the last
+    time it was ingested is skipped: its chunks are already in the store.
+
+    Each file may be bytes or a seekable binary file object (an upload's
+    spooled temp file); file objects are hashed and parsed in chunks.
     
     Returns:
         {
             "ingested": [{"filename": str, "chunks": int, "source_type": str}],
+            "skipped": [{"filename": str, "reason": str}],
             "failed": [{"filename": str, "reason": str}]
         }
     """
-    embed_client = EmbeddingClient()
+    embed_client = get_embedding_client()
     store = VectorStore(db_path=db_path)
 
     ingested: List[Dict[str, Any]] = []
+    skipped: List[Dict[str, str]] = []
     failed: List[Dict[str, str]] = []
 
-    for filename, data in files:
-        # Use universal extraction
-        extracted: ExtractedText = extract_text_from_upload(filename, data)
-        
-        # Check for extraction errors
-        if extracted.error:
-            print(f"[WARN] Extraction error for {filename}: {extracted.error}")
-            failed.append({"filename": filename, "reason": extracted.error})
-            continue
-        
-        text = extracted.text.strip()
-        if not text:
-            print(f"[WARN] No text extracted from {filename}")
-            failed.append({"filename": filename, "reason": "empty extracted text"})
-            continue
+    # Chunk ids are "upload_{stem}_chunk_{i}", so the stem prefix identifies
+    # which rows a file owns in the store
+    doc_keys = [f"upload_{Path(filename).stem}" for filename, _ in files]
+    digests = [digest_source(data) for _, data in files]
+    known = store.get_ingested_hashes(doc_keys) if skip_unchanged else {}
 
-        # Chunk the text
-        chunks = chunk_text(text, max_words=max_words, overlap=overlap)
-        
-        if not chunks:
-            print(f"[WARN] No chunks created for {filename}")
-            failed.append({"filename": filename, "reason": "no chunks created"})
+    todo = []
+    for (filename, data), doc_key, digest in zip(files, doc_keys, digests):
+        if known.get(doc_key) == digest:
+            logger.info("Skipping %s: unchanged since last ingest", filename)
+            skipped.append({"filename": filename, "reason": "unchanged since last ingest"})
             continue
+        todo.append((filename, data, doc_key, digest))
+
+    # Files are extracted on worker threads. Their chunks are collected here,
+    # in upload order, and embedded in shared batches across files (one
+    # Cohere call per MAX_TEXTS_PER_CALL chunks, not one per file); all
+    # SQLite writes stay on this thread
+    batcher = ChunkBatcher(embed_client, store)
+    queued: List[Tuple[str, str, str, int]] = []
+    with ThreadPoolExecutor(max_workers=max(1, min(INGEST_WORKERS, len(todo)))) as pool:
+        futures = [
+            pool.submit(_prepare_upload, filename, data, digest, max_words, overlap)
+            for filename, data, _, digest in todo
+        ]
+        for (filename, _, doc_key, digest), future in zip(todo, futures):
+            reason, prepared = future.result()
+            if reason is not None:
+                failed.append({"filename": filename, "reason": reason})
+                continue
+
+            chunks = prepared["documents"]
+            batcher.add(prepared["ids"], chunks, prepared["metadatas"])
 
-        # Build IDs and metadata
-        ids = []
-        metadatas = []
-        stem = Path(filename).stem
-
-        for i in range(len(chunks)):
-            ids.append(f"upload_{stem}_chunk_{i}")
-            metadatas.append({
-                "source_file": filename,
-                "chunk_index": i,
-                "source_type": extracted.source_type,
-                **extracted.meta,  # Include extraction metadata
+            queued.append((doc_key, digest, filename, len(chunks)))
+            logger.info(
+                "Chunked %s (%d chunks, type: %s)", filename, len(chunks), prepared["source_type"]
+            )
+            ingested.append({
+                "filename": filename,
+                "chunks": len(chunks),
+                "source_type": prepared["source_type"],
             })
+    batcher.flush()
 
-        # Embed and store
-        embeddings = embed_client.embed_texts(chunks)
-        store.add_embeddings(
-            ids=ids,
-            embeddings=embeddings,
-            documents=chunks,
-            metadatas=metadatas,
-        )
-
-        print(f"[INFO] Ingested {filename} ({len(chunks)} chunks, type: {extracted.source_type})")
-        ingested.append({
-            "filename": filename,
-            "chunks": len(chunks),
-            "source_type": extracted.source_type,
-        })
+    # Files are only recorded once all their chunks are stored
+    store.mark_ingested(queued)
 
-    return {"ingested": ingested, "failed": failed}
+    return {"ingested": ingested, "skipped": skipped, "failed": failed}
@@ -1,8 +1,260 @@
-from typing import List, Dict, Any, Tuple
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, List, Dict, Any, Optional, Tuple
 import os
 import sqlite3
-import json
-import math
+import threading
+
+import numpy as np
+
+try:
+    import hnswlib  # optional: approximate search for large stores
+except ImportError:
+    hnswlib = None
+
+from legal_assistant.utils.fast_json import dumps as json_dumps, loads as json_loads
+from legal_assistant.utils.logging_setup import get_logger
+
+logger = get_logger("vector_store")
+
+# Quantize stored vectors to int8 (see VectorStore docstring)
+STORE_INT8 = os.getenv("VECTOR_STORE_INT8", "1") == "1"
+
+# With hnswlib installed, text rows are searched through an HNSW index once
+# there are at least this many of them (below that the exact scan is cheap)
+ANN_MIN_ROWS = int(os.getenv("VECTOR_STORE_ANN_MIN_ROWS", "20000"))
+
+
+def _unit_vector(values) -> np.ndarray:
+    """float32 copy of values scaled to length 1 (all-zero vectors stay zero)."""
+    vec = np.asarray(values, dtype=np.float32)
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm > 0.0 else vec
+
+
+def _encode_vector(values) -> Tuple[bytes, Optional[float]]:
+    """(vec blob, vec_scale) for a new row; see the VectorStore docstring."""
+    unit = _unit_vector(values)
+    if not STORE_INT8:
+        return unit.astype("<f4").tobytes(), None
+
+    # Symmetric per-vector scale: the largest component maps to +-127
+    peak = float(np.max(np.abs(unit))) if unit.size else 0.0
+    scale = peak / 127.0 if peak > 0.0 else 1.0
+    quantized = np.round(unit / scale).astype(np.int8)
+    return quantized.tobytes(), scale
+
+
+def _legacy_values(emb_json: str) -> Optional[np.ndarray]:
+    """The float32 vector in a legacy JSON embedding, or None if unreadable."""
+    try:
+        values = np.asarray(json_loads(emb_json), dtype=np.float32)
+    except (ValueError, TypeError):
+        return None
+    return values if values.ndim == 1 and values.size else None
+
+
+def open_ro(db_path: str) -> sqlite3.Connection:
+    """
+    Read-only connection tuned for scans (inspection and debug scripts):
+    large page cache, memory-mapped reads, autocommit.
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("PRAGMA query_only=ON")
+    conn.execute("PRAGMA cache_size=-200000")  # ~200 MB, allocated as needed
+    conn.execute("PRAGMA mmap_size=1073741824")  # 1 GB
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".m4a")
+
+# Source fields that _init_db exposes as generated columns over the metadata JSON
+SOURCE_COLUMNS = (("source_type", "TEXT"), ("source_file", "TEXT"), ("chunk_index", "INTEGER"))
+_SOURCE_COLUMN_SQL = "CASE WHEN json_valid(metadata) THEN json_extract(metadata, '$.{column}') END"
+
+# WHERE clause for the rows _build_scan_matrix treats as audio: tagged uploads,
+# and rows from older ingests recognized by their file extension
+AUDIO_ROWS_SQL = "(" + " OR ".join(
+    ["source_type = 'audio'"] + [f"source_file LIKE '%{ext}'" for ext in AUDIO_EXTENSIONS]
+) + ")"
+
+
+def embeddings_source_table(conn: sqlite3.Connection) -> str:
+    """
+    FROM clause for read-only scripts that select the source columns. Uses
+    the embeddings table once _init_db has added its generated columns;
+    otherwise a subquery extracting the same values from the metadata JSON,
+    so inspecting an older database never changes its schema.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_xinfo(embeddings)")}
+    if all(column in columns for column, _ in SOURCE_COLUMNS):
+        return "embeddings"
+    extracted = ", ".join(
+        f"{_SOURCE_COLUMN_SQL.format(column=column)} AS {column}" for column, _ in SOURCE_COLUMNS
+    )
+    return f"(SELECT *, {extracted} FROM embeddings)"
+
+
+@dataclass
+class _ScanMatrix:
+    """
+    Every stored vector decoded into one matrix, for query_by_embedding.
+    Audio rows come first, so vectors[:n_audio] and vectors[n_audio:] are
+    the audio and text rows as views, scored separately.
+    """
+    rowids: np.ndarray
+    ids: List[str]
+    # (rows, dim) float32, unit length; rows of any other dimension are left
+    # all zero, so they score 0
+    vectors: np.ndarray
+    n_audio: int
+
+
+# db_path -> (database file state, matrix). Decoding every row is the bulk of
+# a query, so the matrix is kept until the database files change on disk.
+_scan_cache: Dict[str, Tuple[Tuple, _ScanMatrix]] = {}
+
+
+def _file_state(db_path: str) -> Tuple:
+    """(mtime_ns, size) of the database and its WAL; changes on every write."""
+    state = []
+    for path in (db_path, db_path + "-wal"):
+        try:
+            st = os.stat(path)
+            state.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            state.append(None)
+    return tuple(state)
+
+
+def _build_scan_matrix(rows: List[Tuple]) -> _ScanMatrix:
+    """Decode (rowid, id, embedding, vec, vec_scale, source_type, source_file) rows."""
+    # Rows not migrated yet (see _migrate_json_embeddings) only have the JSON
+    # embedding; ones the migration couldn't read are left out of the scan
+    legacy_by_rowid = {}
+    for row in rows:
+        if row[3] is None:
+            values = _legacy_values(row[2])
+            if values is not None:
+                legacy_by_rowid[row[0]] = _unit_vector(values)
+    rows = [row for row in rows if row[3] is not None or row[0] in legacy_by_rowid]
+
+    # Uploads are tagged source_type='audio'; rows from older ingests are
+    # recognized by their file extension
+    is_audio = [
+        source_type == "audio" or (source_file or "").endswith(AUDIO_EXTENSIONS)
+        for *_, source_type, source_file in rows
+    ]
+    rows = [row for row, audio in zip(rows, is_audio) if audio] + [
+        row for row, audio in zip(rows, is_audio) if not audio
+    ]
+    legacy = {
+        i: legacy_by_rowid[row[0]] for i, row in enumerate(rows) if row[0] in legacy_by_rowid
+    }
+    rowids = np.array([row[0] for row in rows], dtype=np.int64)
+    rows = [row[1:] for row in rows]
+    ids = [row[0] for row in rows]
+    dims = np.array(
+        [
+            len(legacy[i]) if i in legacy else (len(vec) if scale is not None else len(vec) // 4)
+            for i, (_, _, vec, scale, _, _) in enumerate(rows)
+        ],
+        dtype=np.int64,
+    )
+    dim = Counter(dims.tolist()).most_common(1)[0][0] if rows else 0
+    valid = dims == dim
+    vectors = np.zeros((len(rows), dim), dtype=np.float32)
+
+    # int8 and float32 rows are decoded with one frombuffer per kind
+    int8_rows = [i for i, row in enumerate(rows) if valid[i] and i not in legacy and row[3] is not None]
+    if int8_rows:
+        blob = b"".join(rows[i][2] for i in int8_rows)
+        scales = np.array([rows[i][3] for i in int8_rows], dtype=np.float32)
+        vectors[int8_rows] = (
+            np.frombuffer(blob, dtype=np.int8).reshape(-1, dim).astype(np.float32) * scales[:, None]
+        )
+    f32_rows = [i for i, row in enumerate(rows) if valid[i] and i not in legacy and row[3] is None]
+    if f32_rows:
+        blob = b"".join(rows[i][2] for i in f32_rows)
+        vectors[f32_rows] = np.frombuffer(blob, dtype="<f4").reshape(-1, dim)
+    for i, vec in legacy.items():
+        if valid[i]:
+            vectors[i] = vec
+
+    return _ScanMatrix(rowids=rowids, ids=ids, vectors=vectors, n_audio=sum(is_audio))
+
+
+class _AnnIndex:
+    """
+    HNSW index (inner product on the unit vectors) over one database's text
+    rows, labelled by SQLite rowid. INSERT OR REPLACE gives a rewritten row a
+    new rowid, so keeping it in step with a new matrix only means adding the
+    rowids it hasn't seen and marking the vanished ones deleted.
+    """
+
+    def __init__(self, dim: int) -> None:
+        self.dim = dim
+        self.index = hnswlib.Index(space="ip", dim=dim)
+        self.index.init_index(max_elements=1024, M=16, ef_construction=200, allow_replace_deleted=True)
+        self.row_of: Dict[int, int] = {}  # rowid -> row in synced_matrix
+        self.synced_matrix: Optional[_ScanMatrix] = None
+        self.lock = threading.Lock()
+
+    def _sync(self, matrix: _ScanMatrix) -> None:
+        text_rows = range(matrix.n_audio, len(matrix.ids))
+        current = dict(zip(matrix.rowids[matrix.n_audio:].tolist(), text_rows))
+
+        for rowid in self.row_of.keys() - current.keys():
+            self.index.mark_deleted(rowid)
+        new = [rowid for rowid in current if rowid not in self.row_of]
+        if new:
+            needed = self.index.get_current_count() + len(new)
+            if needed > self.index.get_max_elements():
+                self.index.resize_index(max(needed, 2 * self.index.get_max_elements()))
+            self.index.add_items(
+                matrix.vectors[[current[rowid] for rowid in new]],
+                np.array(new, dtype=np.int64),
+                replace_deleted=True,
+            )
+
+        self.row_of = current
+        self.synced_matrix = matrix
+
+    def search(self, matrix: _ScanMatrix, query: np.ndarray, k: int) -> np.ndarray:
+        """Matrix rows of (about) the k text rows nearest to query."""
+        with self.lock:
+            if self.synced_matrix is not matrix:
+                self._sync(matrix)
+            k = min(k, len(self.row_of))
+            if k == 0:
+                return np.empty(0, dtype=np.int64)
+            self.index.set_ef(max(4 * k, 128))
+            labels, _ = self.index.knn_query(query, k=k)
+            return np.array([self.row_of[rowid] for rowid in labels[0].tolist()], dtype=np.int64)
+
+
+# db_path -> HNSW index, kept in step with the cached matrix
+_ann_cache: Dict[str, _AnnIndex] = {}
+_ann_cache_lock = threading.Lock()
+
+
+def _ann_index(db_path: str, dim: int) -> _AnnIndex:
+    with _ann_cache_lock:
+        ann = _ann_cache.get(db_path)
+        if ann is None or ann.dim != dim:
+            ann = _ann_cache[db_path] = _AnnIndex(dim)
+        return ann
+
+
+def _top_indices(scores: np.ndarray, candidates: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k best-scoring candidates, best first (argpartition, then sort k)."""
+    if k <= 0 or candidates.size == 0:
+        return candidates[:0]
+    if k < candidates.size:
+        candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
 
 
 class VectorStore:
@@ -11,21 +263,77 @@ class VectorStore:
 
     - Stores one row per chunk:
         id TEXT PRIMARY KEY
-        embedding TEXT (JSON-encoded list[float])
+        embedding TEXT (JSON-encoded list[float]; "" for rows that have vec)
         document TEXT
         metadata TEXT (JSON-encoded dict)
+        vec BLOB (L2-normalized vector, int8 or little-endian float32)
+        vec_scale REAL (int8 rows: vec * vec_scale restores the vector;
+                        NULL means vec is float32)
+        source_type, source_file (generated from metadata, indexed)
+        chunk_index (generated from metadata)
+
+      Vectors are normalized when stored, so cosine similarity at query time
+      is a plain dot product. By default they are also quantized to int8 with
+      a per-vector scale (4x smaller rows, cosine error around 1e-3); set
+      VECTOR_STORE_INT8=0 to store float32. Rows written before the vec column
+      existed are converted from their JSON embedding when the store opens.
+
+    - Tracks which uploaded files are already embedded (ingested_files), keyed
+      by the chunk-id prefix with the sha256 of the file bytes, so unchanged
+      re-uploads can skip extraction and embedding.
 
-    - Query is brute-force: we load all embeddings and compute cosine similarity.
-      This is fine for a prototype and thousands of chunks.
+    - Caches embeddings by sha256(model + chunk text) (embeddings_cache), so
+      re-ingesting a corpus only embeds chunks whose text changed.
+
+    - Query is brute-force: all vectors are decoded into one float32 matrix
+      and scored with a single matrix-vector product, then the top_k rows are
+      picked with argpartition. The matrix is cached per database path until
+      the database files change. With hnswlib installed, stores with
+      ANN_MIN_ROWS or more text rows find text candidates through an HNSW
+      index instead (kept in memory and updated incrementally), and only
+      those candidates are scored exactly.
     """
 
     def __init__(self, db_path: str = "data/index/embeddings.db") -> None:
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         self.db_path = db_path
+        # Set inside bulk(): writes share this connection and one transaction
+        self._bulk_conn: Optional[sqlite3.Connection] = None
         self._init_db()
 
-    def _init_db(self) -> None:
+    def _connect(self) -> sqlite3.Connection:
         conn = sqlite3.connect(self.db_path)
+        # WAL + NORMAL sync: commits don't fsync the main db file every time,
+        # and readers aren't blocked by an ingest in progress
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    @contextmanager
+    def bulk(self) -> Iterator[None]:
+        """
+        Run add_embeddings calls made inside the block on one connection and
+        commit them as a single transaction at the end (rolled back on error).
+        """
+        if self._bulk_conn is not None:
+            yield
+            return
+
+        conn = self._connect()
+        self._bulk_conn = conn
+        try:
+            yield
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._bulk_conn = None
+            conn.close()
+
+    def _init_db(self) -> None:
+        conn = self._connect()
         try:
             cur = conn.cursor()
             cur.execute(
@@ -38,6 +346,164 @@ class VectorStore:
                 )
                 """
             )
+            # table_xinfo (unlike table_info) also lists generated columns
+            columns = {row[1] for row in cur.execute("PRAGMA table_xinfo(embeddings)")}
+            if "vec" not in columns:
+                cur.execute("ALTER TABLE embeddings ADD COLUMN vec BLOB")
+            if "vec_scale" not in columns:
+                cur.execute("ALTER TABLE embeddings ADD COLUMN vec_scale REAL")
+            # Indexed lookups by source instead of LIKE scans over the metadata
+            # JSON, and plain columns for readers that would otherwise parse it
+            # (VIRTUAL: ALTER TABLE can't add STORED generated columns)
+            for column, sql_type in SOURCE_COLUMNS:
+                if column not in columns:
+                    cur.execute(
+                        f"ALTER TABLE embeddings ADD COLUMN {column} {sql_type} GENERATED ALWAYS AS "
+                        f"({_SOURCE_COLUMN_SQL.format(column=column)}) VIRTUAL"
+                    )
+            cur.execute(
+                "CREATE INDEX IF NOT EXISTS idx_embeddings_source ON embeddings (source_type, source_file)"
+            )
+            self._migrate_json_embeddings(conn)
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS ingested_files (
+                    doc_key TEXT PRIMARY KEY,
+                    file_hash TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    chunks INTEGER NOT NULL,
+                    ingested_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+                )
+                """
+            )
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings_cache (
+                    hash TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    vec BLOB NOT NULL
+                )
+                """
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _migrate_json_embeddings(conn: sqlite3.Connection, batch_size: int = 1000) -> None:
+        """
+        Move rows that only have a JSON embedding to the vec column (a no-op
+        once done; runs inside _init_db's transaction).
+        """
+        last_rowid = 0
+        while True:
+            rows = conn.execute(
+                """
+                SELECT rowid, id, embedding FROM embeddings
+                WHERE vec IS NULL AND embedding != '' AND rowid > ?
+                ORDER BY rowid LIMIT ?
+                """,
+                (last_rowid, batch_size),
+            ).fetchall()
+            if not rows:
+                return
+            last_rowid = rows[-1][0]
+            params = []
+            for _, _id, emb_json in rows:
+                values = _legacy_values(emb_json)
+                if values is None:
+                    # Left as is; queries skip such rows too (_build_scan_matrix)
+                    logger.warning("Unreadable embedding for %s, not migrated", _id)
+                    continue
+                params.append((*_encode_vector(values), _id))
+            if params:
+                conn.executemany(
+                    "UPDATE embeddings SET vec = ?, vec_scale = ?, embedding = '' WHERE id = ?",
+                    params,
+                )
+                logger.info("Converted %d JSON embeddings to vec blobs", len(params))
+
+    def get_cached_embeddings(self, hashes: List[str]) -> Dict[str, List[float]]:
+        """
+        Return {hash: embedding} for the content hashes already in the cache.
+        """
+        if not hashes:
+            return {}
+
+        found: Dict[str, List[float]] = {}
+        conn = self._bulk_conn or self._connect()
+        try:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(hashes), 500):
+                part = hashes[start:start + 500]
+                placeholders = ",".join("?" for _ in part)
+                rows = conn.execute(
+                    f"SELECT hash, vec FROM embeddings_cache WHERE hash IN ({placeholders})",
+                    part,
+                ).fetchall()
+                for h, vec in rows:
+                    found[h] = np.frombuffer(vec, dtype=np.float32).tolist()
+        finally:
+            if conn is not self._bulk_conn:
+                conn.close()
+        return found
+
+    def cache_embeddings(self, model: str, rows: List[Tuple[str, List[float]]]) -> None:
+        """
+        Store (hash, embedding) pairs produced by model (existing hashes are kept).
+        """
+        if not rows:
+            return
+
+        params = [(h, model, np.asarray(vec, dtype=np.float32).tobytes()) for h, vec in rows]
+        sql = "INSERT OR IGNORE INTO embeddings_cache (hash, model, vec) VALUES (?, ?, ?)"
+        if self._bulk_conn is not None:
+            self._bulk_conn.executemany(sql, params)
+            return
+
+        conn = self._connect()
+        try:
+            conn.executemany(sql, params)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get_ingested_hashes(self, doc_keys: List[str]) -> Dict[str, str]:
+        """
+        Return {doc_key: file_hash} for the given keys that were ingested before
+        (one query for the whole list).
+        """
+        if not doc_keys:
+            return {}
+
+        placeholders = ",".join("?" for _ in doc_keys)
+        conn = self._connect()
+        try:
+            cur = conn.cursor()
+            cur.execute(
+                f"SELECT doc_key, file_hash FROM ingested_files WHERE doc_key IN ({placeholders})",
+                doc_keys,
+            )
+            return dict(cur.fetchall())
+        finally:
+            conn.close()
+
+    def mark_ingested(self, rows: List[Tuple[str, str, str, int]]) -> None:
+        """
+        Record (doc_key, file_hash, filename, chunks) for freshly ingested files.
+        """
+        if not rows:
+            return
+
+        conn = self._connect()
+        try:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO ingested_files (doc_key, file_hash, filename, chunks)
+                VALUES (?, ?, ?, ?)
+                """,
+                rows,
+            )
             conn.commit()
         finally:
             conn.close()
@@ -55,38 +521,27 @@ class VectorStore:
         if not (len(ids) == len(embeddings) == len(documents) == len(metadatas)):
             raise ValueError("ids, embeddings, documents, metadatas must have same length")
 
-        conn = sqlite3.connect(self.db_path)
+        rows = [
+            (_id, "", doc, json_dumps(meta), *_encode_vector(emb))
+            for _id, emb, doc, meta in zip(ids, embeddings, documents, metadatas)
+        ]
+        sql = """
+            INSERT OR REPLACE INTO embeddings (id, embedding, document, metadata, vec, vec_scale)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """
+
+        if self._bulk_conn is not None:
+            # Committed when the bulk() block ends
+            self._bulk_conn.executemany(sql, rows)
+            return
+
+        conn = self._connect()
         try:
-            cur = conn.cursor()
-            for _id, emb, doc, meta in zip(ids, embeddings, documents, metadatas):
-                cur.execute(
-                    """
-                    INSERT OR REPLACE INTO embeddings (id, embedding, document, metadata)
-                    VALUES (?, ?, ?, ?)
-                    """,
-                    (
-                        _id,
-                        json.dumps(emb),
-                        doc,
-                        json.dumps(meta),
-                    ),
-                )
+            conn.executemany(sql, rows)
             conn.commit()
         finally:
             conn.close()
 
-    def _cosine_similarity(self, a: List[float], b: List[float]) -> float:
-        dot = 0.0
-        norm_a = 0.0
-        norm_b = 0.0
-        for x, y in zip(a, b):
-            dot += x * y
-            norm_a += x * x
-            norm_b += y * y
-        if norm_a == 0.0 or norm_b == 0.0:
-            return 0.0
-        return dot / math.sqrt(norm_a * norm_b)
-
     def query_by_embedding(
         self,
         query_embedding: List[float],
@@ -100,42 +555,81 @@ class VectorStore:
         with artificially boosted scores to ensure they appear in the context for citation.
         This is critical for legal compliance as audio recordings are primary evidence.
         """
-        conn = sqlite3.connect(self.db_path)
+        query = _unit_vector(query_embedding)
+
+        # Taken before connecting: opening a connection recreates the WAL file
+        state = _file_state(self.db_path)
+        conn = self._connect()
         try:
-            cur = conn.cursor()
-            cur.execute("SELECT id, embedding, document, metadata FROM embeddings")
-            rows = cur.fetchall()
+            matrix = self._scan_matrix(conn, state)
+
+            n_audio = matrix.n_audio
+            dims_match = matrix.vectors.shape[1] == query.shape[0]
+
+            # Both sides are unit length, so the dot products are the cosines.
+            # Audio rows are scored (and boosted) on their own first
+            scores = np.zeros(len(matrix.ids), dtype=np.float32)
+            if dims_match:
+                scores[:n_audio] = matrix.vectors[:n_audio] @ query
+            if boost_audio:
+                # Boost audio scores by 2x to ensure they rank higher
+                scores[:n_audio] *= 2.0
+            audio = _top_indices(scores, np.arange(n_audio), top_k)
+
+            # Prioritize audio chunks, then fill with text chunks. Text rows
+            # are only scored when audio left room, and large stores narrow
+            # them down with the HNSW index first, scoring just the candidates
+            text_k = top_k - len(audio)
+            text_rows = np.arange(n_audio, len(matrix.ids))
+            if dims_match and text_k > 0:
+                candidates = None
+                if hnswlib is not None and len(text_rows) >= ANN_MIN_ROWS:
+                    try:
+                        candidates = _ann_index(self.db_path, query.shape[0]).search(matrix, query, text_k)
+                    except RuntimeError as e:
+                        logger.warning("HNSW search failed, using the exact scan: %s", e)
+                if candidates is not None:
+                    text_rows = candidates
+                    scores[text_rows] = matrix.vectors[text_rows] @ query
+                else:
+                    scores[n_audio:] = matrix.vectors[n_audio:] @ query
+            text = _top_indices(scores, text_rows, text_k)
+            top = [(matrix.ids[i], float(scores[i])) for i in np.concatenate([audio, text])]
+
+            # Documents and metadata are only read for the rows returned
+            docs = self._fetch_documents(conn, [_id for _id, _ in top])
         finally:
             conn.close()
 
-        audio_results: List[Tuple[str, float, str, Dict[str, Any]]] = []
-        text_results: List[Tuple[str, float, str, Dict[str, Any]]] = []
-        
-        for _id, emb_json, doc, meta_json in rows:
-            emb = json.loads(emb_json)
-            meta = json.loads(meta_json) if meta_json else {}
-            score = self._cosine_similarity(query_embedding, emb)
-            
-            # Check if this is an audio source
-            source_type = meta.get("source_type", "")
-            source_file = meta.get("source_file", "")
-            is_audio = (source_type == "audio" or 
-                       source_file.endswith(".mp3") or 
-                       source_file.endswith(".wav") or 
-                       source_file.endswith(".m4a"))
-            
-            if is_audio:
-                # Boost audio scores by 2x to ensure they rank higher
-                boosted_score = score * 2.0 if boost_audio else score
-                audio_results.append((_id, boosted_score, doc, meta))
-            else:
-                text_results.append((_id, score, doc, meta))
-        
-        # Sort both lists by score (descending)
-        audio_results.sort(key=lambda x: x[1], reverse=True)
-        text_results.sort(key=lambda x: x[1], reverse=True)
-        
-        # Combine: prioritize audio chunks, then fill with text chunks
-        combined = audio_results + text_results
-        
-        return combined[:top_k]
+        return [(_id, score, *docs[_id]) for _id, score in top if _id in docs]
+
+    def _scan_matrix(self, conn: sqlite3.Connection, state: Tuple) -> _ScanMatrix:
+        """The decoded vectors for this database, rebuilt only after writes."""
+        cached = _scan_cache.get(self.db_path)
+        if cached is not None and cached[0] == state:
+            return cached[1]
+
+        rows = conn.execute(
+            "SELECT rowid, id, embedding, vec, vec_scale, source_type, source_file FROM embeddings"
+        ).fetchall()
+        matrix = _build_scan_matrix(rows)
+        _scan_cache[self.db_path] = (state, matrix)
+        return matrix
+
+    @staticmethod
+    def _fetch_documents(
+        conn: sqlite3.Connection, ids: List[str]
+    ) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+        """{id: (document, metadata_dict)} for ids, in batched IN queries."""
+        found: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(ids), 500):
+            part = ids[start:start + 500]
+            placeholders = ",".join("?" for _ in part)
+            rows = conn.execute(
+                f"SELECT id, document, metadata FROM embeddings WHERE id IN ({placeholders})",
+                part,
+            ).fetchall()
+            for _id, doc, meta_json in rows:
+                found[_id] = (doc, json_loads(meta_json) if meta_json else {})
+        return found
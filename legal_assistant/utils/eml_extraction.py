@@ -4,26 +4,33 @@ from __future__ import annotations
 from email import policy
 from email.parser import BytesParser
 from html import unescape
+import io
 from pathlib import Path
 import re
-from typing import Dict, Any, Optional
+from typing import BinaryIO, Dict, Any, Optional
+
+
+# Compiled once for _strip_html. [^>]* matches the same text as a lazy
+# (?s).*? up to the first ">", without the regex engine trying to stop at
+# every character.
+_SCRIPT_STYLE_RE = re.compile(r"(?is)<(script|style).*?>.*?(</\1>)")
+_TAG_RE = re.compile(r"<[^>]*>")
 
 
 def _strip_html(html: str) -> str:
     """Very lightweight HTML → plain text conversion."""
     text = unescape(html)
     # remove script/style blocks
-    text = re.sub(r"(?is)<(script|style).*?>.*?(</\1>)", "", text)
+    text = _SCRIPT_STYLE_RE.sub("", text)
     # remove all tags
-    text = re.sub(r"(?s)<.*?>", " ", text)
-    # normalize whitespace
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
+    text = _TAG_RE.sub(" ", text)
+    # normalize whitespace (str.split() splits on the same characters as \s+)
+    return " ".join(text.split())
 
 
-def _parse_eml_bytes(data: bytes) -> Dict[str, Any]:
+def _parse_eml(fp: BinaryIO) -> Dict[str, Any]:
     """
-    Parse raw .eml bytes and return a dict:
+    Parse a binary .eml stream and return a dict:
     {
       "from": str,
       "to": str,
@@ -31,8 +38,12 @@ def _parse_eml_bytes(data: bytes) -> Dict[str, Any]:
       "date": str,
       "body": str,
     }
+
+    The stream is fed to the parser in chunks. parsebytes() first decodes the
+    whole message into one str and wraps it in a StringIO, which for a large
+    email with attachments costs several times the message size in memory.
     """
-    msg = BytesParser(policy=policy.default).parsebytes(data)
+    msg = BytesParser(policy=policy.default).parse(fp)
 
     from_ = msg.get("from", "") or ""
     to = msg.get("to", "") or ""
@@ -83,6 +94,11 @@ def _parse_eml_bytes(data: bytes) -> Dict[str, Any]:
     }
 
 
+def _parse_eml_bytes(data: bytes) -> Dict[str, Any]:
+    """Parse raw .eml bytes (see _parse_eml)."""
+    return _parse_eml(io.BytesIO(data))
+
+
 def extract_eml(path: str | Path) -> Optional[Dict[str, Any]]:
     """
     Public function used by ingest_eml_corpus.
@@ -91,13 +107,12 @@ def extract_eml(path: str | Path) -> Optional[Dict[str, Any]]:
     """
     path = Path(path)
     try:
-        data = path.read_bytes()
-    except Exception as e:
+        with path.open("rb") as f:
+            eml_data = _parse_eml(f)
+    except OSError as e:
         print(f"[ERROR] Failed to read EML file {path}: {e}")
         return None
 
-    eml_data = _parse_eml_bytes(data)
-
     # If there is literally no body and no subject, treat as empty
     if not (eml_data["subject"].strip() or eml_data["body"].strip()):
         return None
@@ -0,0 +1,112 @@
+# legal_assistant/utils/extract_cache.py
+"""
+Disk cache for extracted upload text, keyed by the sha256 of the file bytes.
+
+PDF parsing and audio transcription dominate the upload endpoints, and the
+same documents are typically uploaded again for analysis, relevance checks
+and questions. get_or_extract runs extract_text_from_upload at most once per
+unique file and serves later uploads from data/extract_cache/.
+"""
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from legal_assistant.utils.fast_json import dumps as json_dumps, loads as json_loads
+from legal_assistant.utils.universal_extraction import (
+    DocumentSource,
+    ExtractedText,
+    TEXT_EXTENSIONS,
+    extract_text_from_upload,
+)
+from legal_assistant.utils.logging_setup import get_logger
+
+logger = get_logger("extract_cache")
+
+EXTRACT_CACHE_DIR = os.getenv("EXTRACT_CACHE_DIR", os.path.join("data", "extract_cache"))
+# Least recently used entries beyond this count are deleted
+EXTRACT_CACHE_MAX_FILES = int(os.getenv("EXTRACT_CACHE_MAX_FILES", "2000"))
+
+_HASH_CHUNK = 1024 * 1024
+
+
+def digest_source(data: DocumentSource) -> str:
+    """sha256 of the upload; file objects are hashed in chunks and rewound."""
+    if isinstance(data, (bytes, bytearray)):
+        return hashlib.sha256(data).hexdigest()
+    h = hashlib.sha256()
+    data.seek(0)
+    for block in iter(lambda: data.read(_HASH_CHUNK), b""):
+        h.update(block)
+    data.seek(0)
+    return h.hexdigest()
+
+
+def _load(path: str) -> Optional[ExtractedText]:
+    try:
+        with open(path, "rb") as f:
+            entry = json_loads(f.read())
+        # Refresh mtime so pruning evicts least recently used entries
+        os.utime(path)
+        return ExtractedText(
+            text=entry["text"],
+            source_type=entry["source_type"],
+            meta=entry.get("meta") or {},
+        )
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("Ignoring unreadable extract cache entry %s: %s", path, e)
+        return None
+
+
+def _store(path: str, extracted: ExtractedText) -> None:
+    entry = {"text": extracted.text, "source_type": extracted.source_type, "meta": extracted.meta}
+    try:
+        os.makedirs(EXTRACT_CACHE_DIR, exist_ok=True)
+        # Write then rename, so concurrent readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=EXTRACT_CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(json_dumps(entry))
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning("Could not write extract cache entry %s: %s", path, e)
+        return
+    _prune()
+
+
+def _prune() -> None:
+    try:
+        entries = [e for e in os.scandir(EXTRACT_CACHE_DIR) if e.name.endswith(".json")]
+        if len(entries) <= EXTRACT_CACHE_MAX_FILES:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for e in entries[: len(entries) - EXTRACT_CACHE_MAX_FILES]:
+            os.remove(e.path)
+    except OSError as e:
+        logger.warning("Extract cache prune failed: %s", e)
+
+
+def get_or_extract(filename: str, data: DocumentSource, digest: Optional[str] = None) -> ExtractedText:
+    """
+    Cached extract_text_from_upload. Failed extractions aren't cached, and
+    plain text files are decoded directly since that is cheaper than a lookup.
+
+    Pass digest (digest_source(data)) if the caller already hashed the file.
+    """
+    ext = Path(filename).suffix.lower()
+    if ext in TEXT_EXTENSIONS:
+        return extract_text_from_upload(filename, data)
+
+    # The extension picks the extractor, so it is part of the key
+    path = os.path.join(EXTRACT_CACHE_DIR, f"{digest or digest_source(data)}{ext}.json")
+    cached = _load(path)
+    if cached is not None:
+        logger.debug("Extract cache hit: %s", filename)
+        return cached
+
+    extracted = extract_text_from_upload(filename, data)
+    if extracted.error is None and extracted.text.strip():
+        _store(path, extracted)
+    return extracted
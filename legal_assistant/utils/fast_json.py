@@ -0,0 +1,31 @@
+# legal_assistant/utils/fast_json.py
+"""
+JSON encoding/parsing with orjson when it is installed, stdlib json otherwise.
+
+orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can keep
+catching json.JSONDecodeError either way.
+"""
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data: Union[str, bytes, bytearray]) -> Any:
+    """Drop-in for json.loads (str or bytes input)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> str:
+    """
+    Compact JSON string with non-ASCII kept as-is, like
+    json.dumps(obj, ensure_ascii=False).
+    """
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False)
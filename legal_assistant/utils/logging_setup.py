@@ -0,0 +1,45 @@
+# legal_assistant/utils/logging_setup.py
+"""
+Non-blocking logging for the API.
+
+Records are pushed onto an in-memory queue by the request path and written
+to stderr by a QueueListener on its own thread, so a slow terminal never
+stalls the event loop.
+"""
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+_ROOT_NAME = "legal_assistant"
+_listener = None
+
+
+def _start_listener() -> None:
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    _listener = QueueListener(log_queue, stream_handler)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger(_ROOT_NAME)
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    # uvicorn configures the root logger too; don't write every line twice
+    root.propagate = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Return a logger under the "legal_assistant" namespace, e.g.
+    get_logger("api") -> "legal_assistant.api".
+    """
+    _start_listener()
+    return logging.getLogger(f"{_ROOT_NAME}.{name}")
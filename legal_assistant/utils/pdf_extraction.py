@@ -3,10 +3,28 @@ from typing import Optional
 
 from pypdf import PdfReader
 
+try:
+    import pymupdf  # optional: C parser, several times faster than pypdf
+except ImportError:
+    pymupdf = None
+
+
+def _open_pages(pdf_path: Path):
+    """The PDF's pages, as PyMuPDF pages if it is installed, else pypdf pages."""
+    if pymupdf is not None:
+        return pymupdf.open(str(pdf_path))
+    return PdfReader(str(pdf_path)).pages
+
+
+def _page_text(page) -> str:
+    if pymupdf is not None:
+        return page.get_text("text")
+    return page.extract_text() or ""
+
 
 def extract_text_from_pdf(path: str | Path) -> Optional[str]:
     """
-    Extracts text from a PDF file using pypdf.
+    Extracts text from a PDF file using PyMuPDF if installed, else pypdf.
 
     Returns the full text as a single string, or None if extraction fails.
     """
@@ -17,18 +35,20 @@ def extract_text_from_pdf(path: str | Path) -> Optional[str]:
         return None
 
     try:
-        reader = PdfReader(str(pdf_path))
+        pages = _open_pages(pdf_path)
     except Exception as e:
         print(f"[ERROR] Failed to open PDF {pdf_path}: {e}")
         return None
 
     texts: list[str] = []
-    for i, page in enumerate(reader.pages):
+    for i, page in enumerate(pages):
         try:
-            page_text = page.extract_text() or ""
+            page_text = _page_text(page)
             texts.append(page_text)
         except Exception as e:
             print(f"[WARN] Failed to extract text from page {i} of {pdf_path}: {e}")
+    if pymupdf is not None:
+        pages.close()
 
     full_text = "\n".join(texts).strip()
     if not full_text:
@@ -0,0 +1,76 @@
+# legal_assistant/utils/tokens.py
+"""
+Token-aware truncation for LLM prompts.
+
+Uses tiktoken when it is installed (and its encoding file can be loaded);
+otherwise falls back to a character slice of ~4 chars per token.
+"""
+import os
+from functools import lru_cache
+
+from legal_assistant.utils.logging_setup import get_logger
+
+logger = get_logger("tokens")
+
+# Rough chars-per-token ratio for English text, used when tiktoken is missing
+CHARS_PER_TOKEN = 4
+# Tokens are essentially never longer than this; text past max_tokens * this
+# can't fit, so it is cut before encoding to keep huge documents cheap
+MAX_CHARS_PER_TOKEN = 10
+
+# When snapping a cut back to a paragraph break, don't give up more than
+# this fraction of the allowed text
+MIN_SNAP_KEEP = 0.5
+
+# o200k_base is the gpt-4o / gpt-4o-mini encoding. Azure deployment names
+# aren't model names, so the encoding is configured rather than looked up.
+TIKTOKEN_ENCODING = os.getenv("TIKTOKEN_ENCODING", "o200k_base")
+
+
+@lru_cache(maxsize=1)
+def get_encoder():
+    """
+    Return the shared tiktoken encoder, or None if tiktoken isn't available.
+    """
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(TIKTOKEN_ENCODING)
+    except Exception as e:
+        logger.warning("tiktoken unavailable, truncating by characters: %s", e)
+        return None
+
+
+def _snap_to_paragraph(cut: str) -> str:
+    """
+    Move a cut back to the last paragraph (or failing that, line) break,
+    unless that would drop more than MIN_SNAP_KEEP of the text.
+    """
+    for sep in ("\n\n", "\n"):
+        pos = cut.rfind(sep)
+        if pos >= len(cut) * MIN_SNAP_KEEP:
+            return cut[:pos].rstrip()
+    return cut
+
+
+def truncate_to_tokens(text: str, max_tokens: int, snap_to_paragraph: bool = False) -> str:
+    """
+    Trim text to at most max_tokens tokens (approximately, without tiktoken).
+
+    With snap_to_paragraph, text that had to be cut ends at a paragraph
+    break instead of mid-sentence.
+    """
+    enc = get_encoder()
+    if enc is None:
+        cut = text[: max_tokens * CHARS_PER_TOKEN]
+    # Nothing to do if even one token per char would fit
+    elif len(text) <= max_tokens:
+        return text
+    else:
+        head = text[: max_tokens * MAX_CHARS_PER_TOKEN]
+        tokens = enc.encode(head, disallowed_special=())
+        cut = head if len(tokens) <= max_tokens else enc.decode(tokens[:max_tokens])
+
+    if snap_to_paragraph and len(cut) < len(text):
+        return _snap_to_paragraph(cut)
+    return cut
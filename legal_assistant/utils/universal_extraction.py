@@ -5,11 +5,20 @@ Supports: PDF, DOCX, PPTX, HTML, TXT, MD, CSV, LOG, EML, and audio files.
 """
 from __future__ import annotations
 
+import io
+import mmap
+import multiprocessing
 import os
+import shutil
 import tempfile
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Iterator, List, Optional, Union
 
 # Existing EML extraction
 from legal_assistant.utils.eml_extraction import extract_eml_from_bytes
@@ -78,23 +87,147 @@ def _extract_eml(data: bytes) -> ExtractedText:
 
 DOCUMENT_EXTENSIONS = {".pdf", ".docx", ".pptx", ".html", ".htm"}
 
+# Parsers for these read from a seekable stream, so a file object (e.g. an
+# upload's spooled temp file) is handed over as-is instead of copied to bytes
+STREAMABLE_EXTENSIONS = {".pdf", ".docx", ".pptx"}
 
-def _extract_pdf(data: bytes) -> ExtractedText:
-    """Extract text from PDF using pypdf."""
+# Bytes or a seekable binary file object
+DocumentSource = Union[bytes, BinaryIO]
+
+
+def _as_stream(data: DocumentSource) -> BinaryIO:
+    if isinstance(data, (bytes, bytearray)):
+        return io.BytesIO(data)
+    data.seek(0)
+    return data
+
+
+@contextmanager
+def _pdf_buffer(data: DocumentSource) -> Iterator[Union[bytes, memoryview]]:
+    """
+    The PDF as a buffer PyMuPDF can open in place: an in-memory upload is
+    exposed through its BytesIO buffer and a spooled-to-disk one is
+    memory-mapped, so neither is copied into a new bytes object.
+    """
+    if isinstance(data, bytes):
+        yield data
+        return
+    if isinstance(data, bytearray):
+        with memoryview(data) as view:
+            yield view
+        return
+    # SpooledTemporaryFile keeps small files in a BytesIO until it rolls over
+    inner = getattr(data, "_file", data)
+    if isinstance(inner, io.BytesIO):
+        with inner.getbuffer() as view:
+            yield view
+        return
+    with mmap.mmap(data.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        with memoryview(mapped) as view:
+            yield view
+
+
+# PDFs with at least this many pages are split across PDF_WORKERS processes
+# (PyMuPDF only; smaller files aren't worth shipping to another process)
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "64"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+_pdf_pool_lock = threading.Lock()
+
+
+def _pdf_page_range_text(pdf_bytes: bytes, start: int, stop: int) -> List[str]:
+    """Text of pages start..stop-1 (runs in a worker process)."""
+    import pymupdf
+
+    with pymupdf.open(stream=pdf_bytes, filetype="pdf") as doc:
+        return [doc[i].get_text("text") for i in range(start, stop)]
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """
+    Process pool shared by all PDF extractions, started on first use.
+
+    Workers are spawned rather than forked: the pool is started from an
+    extraction thread while the server's other threads may hold locks
+    (logging, PyMuPDF, the allocator) that a forked child would inherit.
+    """
+    global _pdf_pool
+    if _pdf_pool is None:
+        with _pdf_pool_lock:
+            if _pdf_pool is None:
+                _pdf_pool = ProcessPoolExecutor(
+                    max_workers=PDF_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _pdf_pool
+
+
+def _discard_pdf_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next PDF starts a fresh one."""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is pool:
+            _pdf_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pdf_pool() -> None:
+    """Stop the PDF worker processes, if any were started."""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        pool, _pdf_pool = _pdf_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _extract_pdf_pages_parallel(pdf_bytes: bytes, page_count: int) -> List[str]:
+    """Page texts, one contiguous range of pages per worker."""
+    step = -(-page_count // PDF_WORKERS)
+    pool = _get_pdf_pool()
     try:
-        from pypdf import PdfReader
-        import io
-        
-        reader = PdfReader(io.BytesIO(data))
-        texts = []
-        for page in reader.pages:
-            texts.append(page.extract_text() or "")
+        futures = [
+            pool.submit(_pdf_page_range_text, pdf_bytes, start, min(start + step, page_count))
+            for start in range(0, page_count, step)
+        ]
+        return [text for future in futures for text in future.result()]
+    except BrokenProcessPool:
+        _discard_pdf_pool(pool)
+        raise
+
+
+def _extract_pdf(data: DocumentSource) -> ExtractedText:
+    """Extract text from PDF using PyMuPDF if installed, else pypdf."""
+    try:
+        try:
+            import pymupdf
+        except ImportError:
+            pymupdf = None
+
+        if pymupdf is not None:
+            with _pdf_buffer(data) as buffer:
+                with pymupdf.open(stream=buffer, filetype="pdf") as doc:
+                    page_count = doc.page_count
+                    parallel = PDF_WORKERS > 1 and page_count >= PDF_PARALLEL_MIN_PAGES
+                    if not parallel:
+                        texts = [page.get_text("text") for page in doc]
+                # Worker processes need their own copy of the file
+                pdf_bytes = bytes(buffer) if parallel else None
+            if parallel:
+                texts = _extract_pdf_pages_parallel(pdf_bytes, page_count)
+        else:
+            from pypdf import PdfReader
+
+            reader = PdfReader(_as_stream(data))
+            texts = []
+            for page in reader.pages:
+                texts.append(page.extract_text() or "")
         
         text = "\n".join(texts).strip()
         return ExtractedText(
             text=text,
             source_type="pdf",
-            meta={"pages": len(reader.pages)}
+            meta={"pages": len(texts)}
         )
     except Exception as e:
         return ExtractedText(
@@ -104,13 +237,12 @@ def _extract_pdf(data: bytes) -> ExtractedText:
         )
 
 
-def _extract_docx(data: bytes) -> ExtractedText:
+def _extract_docx(data: DocumentSource) -> ExtractedText:
     """Extract text from DOCX using python-docx."""
     try:
         from docx import Document
-        import io
         
-        doc = Document(io.BytesIO(data))
+        doc = Document(_as_stream(data))
         texts = [para.text for para in doc.paragraphs if para.text.strip()]
         text = "\n\n".join(texts)
         
@@ -133,13 +265,12 @@ def _extract_docx(data: bytes) -> ExtractedText:
         )
 
 
-def _extract_pptx(data: bytes) -> ExtractedText:
+def _extract_pptx(data: DocumentSource) -> ExtractedText:
     """Extract text from PPTX using python-pptx."""
     try:
         from pptx import Presentation
-        import io
         
-        prs = Presentation(io.BytesIO(data))
+        prs = Presentation(_as_stream(data))
         texts = []
         for slide in prs.slides:
             for shape in slide.shapes:
@@ -167,11 +298,27 @@ def _extract_pptx(data: bytes) -> ExtractedText:
 
 
 def _extract_html(data: bytes) -> ExtractedText:
-    """Extract text from HTML using BeautifulSoup."""
+    """Extract text from HTML using selectolax (lexbor), else BeautifulSoup."""
     try:
+        text = data.decode("utf-8", errors="ignore")
+        try:
+            from selectolax.lexbor import LexborHTMLParser
+        except ImportError:
+            pass
+        else:
+            tree = LexborHTMLParser(text)
+            tree.strip_tags(["script", "style"])
+            # Same output as BeautifulSoup's get_text(separator="\n", strip=True):
+            # lexbor keeps whitespace-only nodes as empty pieces, so drop them
+            pieces = tree.root.text(separator="\x00", strip=True).split("\x00") if tree.root else []
+            return ExtractedText(
+                text="\n".join(piece for piece in pieces if piece),
+                source_type="html",
+                meta={}
+            )
+
         from bs4 import BeautifulSoup
         
-        text = data.decode("utf-8", errors="ignore")
         soup = BeautifulSoup(text, "html.parser")
         
         # Remove script and style elements
@@ -198,7 +345,7 @@ def _extract_html(data: bytes) -> ExtractedText:
         )
 
 
-def _extract_document(filename: str, data: bytes) -> ExtractedText:
+def _extract_document(filename: str, data: DocumentSource) -> ExtractedText:
     """Route document extraction based on file type."""
     ext = Path(filename).suffix.lower()
     
@@ -225,7 +372,16 @@ def _extract_document(filename: str, data: bytes) -> ExtractedText:
 AUDIO_EXTENSIONS = {".mp3", ".wav", ".m4a", ".aac", ".flac", ".ogg", ".wma", ".webm"}
 
 
-def _transcribe_audio_azure(filename: str, data: bytes) -> ExtractedText:
+def _write_to(tmp, data: DocumentSource) -> None:
+    """Write bytes, or copy a file object in chunks, into an open temp file."""
+    if isinstance(data, (bytes, bytearray)):
+        tmp.write(data)
+    else:
+        data.seek(0)
+        shutil.copyfileobj(data, tmp, 1024 * 1024)
+
+
+def _transcribe_audio_azure(filename: str, data: DocumentSource) -> ExtractedText:
     """
     Transcribe audio using Azure OpenAI Whisper API.
     Falls back to local faster-whisper if Azure is unavailable.
@@ -250,34 +406,26 @@ def _transcribe_audio_azure(filename: str, data: bytes) -> ExtractedText:
                 api_version=api_version,
             )
             
-            # Write to temp file for API
-            with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tmp:
-                tmp.write(data)
-                tmp_path = tmp.name
-            
-            try:
-                with open(tmp_path, "rb") as audio_file:
-                    # Use whisper-1 model for transcription
-                    whisper_model = os.getenv("OPENAI_WHISPER_MODEL", "whisper-1")
-                    transcription = client.audio.transcriptions.create(
-                        model=whisper_model,
-                        file=audio_file,
-                        response_format="text"
-                    )
-                
-                text = transcription if isinstance(transcription, str) else str(transcription)
-                
-                print(f"[EXTRACT] Audio transcribed via Azure Whisper: {filename}")
-                return ExtractedText(
-                    text=text,
-                    source_type="audio",
-                    meta={"transcription_method": "azure_whisper", "format": ext.lstrip(".")}
-                )
-            finally:
-                try:
-                    os.unlink(tmp_path)
-                except OSError:
-                    pass
+            # Sent straight from memory (or the upload's spooled file), no
+            # temp file; the filename tells the API which audio format it is
+            audio_file = (Path(filename).name, _as_stream(data))
+
+            # Use whisper-1 model for transcription
+            whisper_model = os.getenv("OPENAI_WHISPER_MODEL", "whisper-1")
+            transcription = client.audio.transcriptions.create(
+                model=whisper_model,
+                file=audio_file,
+                response_format="text"
+            )
+
+            text = transcription if isinstance(transcription, str) else str(transcription)
+
+            print(f"[EXTRACT] Audio transcribed via Azure Whisper: {filename}")
+            return ExtractedText(
+                text=text,
+                source_type="audio",
+                meta={"transcription_method": "azure_whisper", "format": ext.lstrip(".")}
+            )
     except Exception as azure_err:
         print(f"[WARN] Azure Whisper unavailable: {azure_err}, trying local faster-whisper")
 
@@ -285,7 +433,29 @@ def _transcribe_audio_azure(filename: str, data: bytes) -> ExtractedText:
     return _transcribe_audio_local(filename, data)
 
 
-def _transcribe_audio_local(filename: str, data: bytes) -> ExtractedText:
+# Loading a Whisper model takes seconds, so loaded models are kept for the
+# life of the process. Whisper's transcribe installs kv-cache hooks on the
+# model it runs, so calls sharing a model are serialized.
+_whisper_load_lock = threading.Lock()
+_whisper_transcribe_lock = threading.Lock()
+
+
+@lru_cache(maxsize=2)
+def _load_whisper_model(model_size: str):
+    import whisper
+    return whisper.load_model(model_size)
+
+
+def get_whisper_model(model_size: Optional[str] = None):
+    """
+    Shared local Whisper model (WHISPER_MODEL_SIZE, default "base"), loaded
+    on first use.
+    """
+    with _whisper_load_lock:
+        return _load_whisper_model(model_size or os.getenv("WHISPER_MODEL_SIZE", "base"))
+
+
+def _transcribe_audio_local(filename: str, data: DocumentSource) -> ExtractedText:
     """
     Transcribe audio using local OpenAI Whisper.
     Requires ffmpeg to be installed and in PATH.
@@ -302,7 +472,6 @@ def _transcribe_audio_local(filename: str, data: bytes) -> ExtractedText:
         )
     
     # Check for ffmpeg
-    import shutil
     if not shutil.which("ffmpeg"):
         return ExtractedText(
             text="",
@@ -315,7 +484,7 @@ def _transcribe_audio_local(filename: str, data: bytes) -> ExtractedText:
     tmp_path = tmp_file.name
     
     try:
-        tmp_file.write(data)
+        _write_to(tmp_file, data)
         tmp_file.flush()
         tmp_file.close()  # Must close before Whisper can read on Windows
         
@@ -326,10 +495,10 @@ def _transcribe_audio_local(filename: str, data: bytes) -> ExtractedText:
             raise ValueError("Temp audio file is empty")
         
         # Use base model for balance of speed/accuracy; can be configured
-        model_size = os.getenv("WHISPER_MODEL_SIZE", "base")
-        model = whisper.load_model(model_size)
-        
-        result = model.transcribe(tmp_path)
+        model = get_whisper_model()
+
+        with _whisper_transcribe_lock:
+            result = model.transcribe(tmp_path)
         
         text = result["text"].strip()
         
@@ -361,9 +530,14 @@ def _transcribe_audio_local(filename: str, data: bytes) -> ExtractedText:
 # Main extraction router
 # ---------------------------------------------------------------------------
 
-def extract_text_from_upload(filename: str, data: bytes) -> ExtractedText:
+def extract_text_from_upload(filename: str, data: DocumentSource) -> ExtractedText:
     """
     Universal text extraction from uploaded file bytes.
+
+    data may also be a seekable binary file object (e.g. UploadFile.file).
+    PDF/DOCX/PPTX are then parsed straight from the stream and audio is copied
+    to its temp file in chunks, so large uploads are never held in memory as
+    one bytes object; other types are read in.
     
     Routes to appropriate extractor based on file extension:
     - .txt, .md, .csv, .log → UTF-8 decode
@@ -375,10 +549,17 @@ def extract_text_from_upload(filename: str, data: bytes) -> ExtractedText:
     - .mp3, .wav, .m4a, .aac, .flac, .ogg, .wma, .webm → Whisper transcription
     - Unknown → Fallback UTF-8 decode
     """
+    ext = Path(filename).suffix.lower()
+
+    if not isinstance(data, (bytes, bytearray)):
+        if ext not in STREAMABLE_EXTENSIONS and ext not in AUDIO_EXTENSIONS:
+            data.seek(0)
+            data = data.read()
+        elif data.seek(0, os.SEEK_END) == 0:
+            return ExtractedText(text="", source_type="unknown", error="Empty file")
+
     if not data:
         return ExtractedText(text="", source_type="unknown", error="Empty file")
-
-    ext = Path(filename).suffix.lower()
     
     # Text files
     if ext in TEXT_EXTENSIONS:
@@ -15,8 +15,8 @@ def main():
             print("Exiting.")
             break
 
-        # 1) Embed the query
-        query_embedding = embed_client.embed_texts([query])[0]
+        # 1) Embed the query (repeated queries come from the in-process cache)
+        query_embedding = embed_client.embed_one(query)
 
         # 2) Search in vector store
         results = store.query_by_embedding(query_embedding, top_k=5)
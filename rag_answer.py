@@ -1,9 +1,21 @@
-import json
+from functools import lru_cache
 from typing import List, Dict, Any
 
-from legal_assistant.llm.embeddings_client import EmbeddingClient
-from legal_assistant.llm.chat_client import ChatClient
+from legal_assistant.llm.embeddings_client import get_embedding_client
+from legal_assistant.llm.chat_client import get_chat_client
 from legal_assistant.retrieval.vector_store import VectorStore
+from legal_assistant.utils.fast_json import loads as json_loads
+
+
+@lru_cache(maxsize=1)
+def _get_store() -> VectorStore:
+    """
+    VectorStore shared by every question, so the schema checks in its
+    constructor run once per process. It opens a connection per query, so
+    concurrent requests can share it.
+    """
+    return VectorStore(db_path="data/index/embeddings.db")
+
 
 def _strip_code_fences(text: str) -> str:
     """
@@ -14,19 +26,21 @@ def _strip_code_fences(text: str) -> str:
 
     text = text.strip()
 
-    # If it starts with a code fence (``` or ```json)
+    # If it starts with a code fence (``` or ```json). Slices by index rather
+    # than splitting the whole answer into lines and joining it back
     if text.startswith("```"):
-        lines = text.splitlines()
-
         # Drop first line (``` or ```json)
-        if lines:
-            lines = lines[1:]
+        newline = text.find("\n")
+        if newline == -1:
+            return ""
+        body = text[newline + 1:]
 
         # Drop last line if it is a closing fence
-        if lines and lines[-1].strip().startswith("```"):
-            lines = lines[:-1]
+        last_line = body.rfind("\n") + 1
+        if body[last_line:].strip().startswith("```"):
+            body = body[:last_line]
 
-        return "\n".join(lines).strip()
+        return body.strip()
 
     return text
 
@@ -111,12 +125,12 @@ def answer_question(
     """
     history = history or []
 
-    embed_client = EmbeddingClient()
-    chat_client = ChatClient()
-    store = VectorStore(db_path="data/index/embeddings.db")
+    embed_client = get_embedding_client()
+    chat_client = get_chat_client()
+    store = _get_store()
 
-    # Step 1: Embed query
-    query_emb = embed_client.embed_texts([question])[0]
+    # Step 1: Embed query (repeated questions come from the in-process cache)
+    query_emb = embed_client.embed_one(question)
 
     # Step 2: Retrieve relevant chunks
     retrieved = store.query_by_embedding(query_emb, top_k=top_k)
@@ -221,15 +235,15 @@ def analyze_legal_case(
         ]
       }
     """
-    embed_client = EmbeddingClient()
-    chat_client = ChatClient()
-    store = VectorStore(db_path="data/index/embeddings.db")
+    embed_client = get_embedding_client()
+    chat_client = get_chat_client()
+    store = _get_store()
 
     # Build the query from UI metadata
     question = _build_case_question(metadata, filenames)
 
-    # 1) Embed the query
-    query_emb = embed_client.embed_texts([question])[0]
+    # 1) Embed the query (re-running the same case description hits the cache)
+    query_emb = embed_client.embed_one(question)
 
     # 2) Retrieve relevant chunks
     retrieved = store.query_by_embedding(query_emb, top_k=top_k)
@@ -433,7 +447,7 @@ Now produce the JSON response as specified.
     issues: List[Dict[str, Any]] = []
 
     try:
-        parsed = json.loads(cleaned)
+        parsed = json_loads(cleaned)
         if isinstance(parsed, dict):
             analysis = parsed.get("analysis", cleaned)
             issues = parsed.get("issues", [])
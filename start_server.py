@@ -39,10 +39,25 @@ print("\nStarting FastAPI server...")
 print("API will be available at: http://localhost:8000")
 print("Press Ctrl+C to stop\n")
 
-subprocess.run([
+cmd = [
     sys.executable, "-m", "uvicorn", 
     "api_server:app", 
-    "--reload", 
     "--host", "0.0.0.0", 
-    "--port", "8000"
-])
+    "--port", "8000",
+]
+
+# Faster event loop / HTTP parser when available (uvloop has no Windows build)
+import importlib.util
+if importlib.util.find_spec("uvloop"):
+    cmd += ["--loop", "uvloop"]
+if importlib.util.find_spec("httptools"):
+    cmd += ["--http", "httptools"]
+
+# --reload only works with a single worker; set UVICORN_WORKERS for production
+workers = int(os.environ.get("UVICORN_WORKERS", "1"))
+if workers > 1:
+    cmd += ["--workers", str(workers)]
+else:
+    cmd.append("--reload")
+
+subprocess.run(cmd)
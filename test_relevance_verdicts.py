@@ -0,0 +1,66 @@
+"""
+Offline checks for parse_llm_verdicts: the relevance model's JSON reply is
+normalized into verdict dicts however loosely it follows the schema.
+"""
+import json
+
+from api_server import parse_llm_verdicts
+
+
+def test_well_formed_reply():
+    reply = json.dumps({"results": [{
+        "id": 3,
+        "category": "Highly_Relevant",
+        "summary": " Email about the contract. ",
+        "reason": "Mentions the breach.",
+        "snippets": ["breach of contract"],
+    }]})
+    assert parse_llm_verdicts(reply) == {3: {
+        "category": "highly_relevant",
+        "summary": "Email about the contract.",
+        "reason": "Mentions the breach.",
+        "snippets": ["breach of contract"],
+    }}
+
+
+def test_loose_fields_are_coerced():
+    reply = json.dumps({"results": [
+        {"id": "7", "category": None, "summary": 12, "snippets": "one snippet"},
+        {"id": 8, "snippets": [None, "kept", 5]},
+        {"id": 9, "snippets": {"not": "a list"}},
+    ]})
+    verdicts = parse_llm_verdicts(reply)
+    assert verdicts[7] == {"category": "", "summary": "12", "reason": "", "snippets": ["one snippet"]}
+    assert verdicts[8]["snippets"] == ["kept", "5"]
+    assert verdicts[9]["snippets"] == []
+
+
+def test_unusable_entries_are_dropped():
+    reply = json.dumps({"results": [
+        "not an object",
+        {"category": "not_relevant"},
+        {"id": "abc"},
+        {"id": 1, "category": "not_relevant"},
+    ]})
+    assert list(parse_llm_verdicts(reply)) == [1]
+
+
+def test_reply_without_results_list():
+    assert parse_llm_verdicts(json.dumps({"results": {"id": 1}})) == {}
+    assert parse_llm_verdicts(json.dumps([{"id": 1}])) == {}
+    assert parse_llm_verdicts("{}") == {}
+
+
+def main():
+    for check in (
+        test_well_formed_reply,
+        test_loose_fields_are_coerced,
+        test_unusable_entries_are_dropped,
+        test_reply_without_results_list,
+    ):
+        check()
+        print(f"OK  {check.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Offline checks for the SQLite vector store: vector encoding, legacy JSON
+migration and HNSW search. Uses temp databases and made-up vectors, so no
+API keys are needed.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+
+import numpy as np
+
+from legal_assistant.retrieval import vector_store
+from legal_assistant.retrieval.vector_store import VectorStore, _build_scan_matrix, _encode_vector
+
+# Short vectors quantize worst; cosine error stays well under INT8_TOLERANCE
+DIM = 64
+INT8_TOLERANCE = 5e-3
+
+
+def _ranked_vectors(n: int, seed: int = 0):
+    """
+    A query plus n vectors whose cosines to it are spread evenly from 0.95
+    down to -0.95, so the true ranking has clear gaps between neighbours.
+    """
+    rng = np.random.default_rng(seed)
+    query = rng.normal(size=DIM)
+    query /= np.linalg.norm(query)
+    vectors = []
+    for cos in np.linspace(0.95, -0.95, n):
+        other = rng.normal(size=DIM)
+        other -= other.dot(query) * query
+        other /= np.linalg.norm(other)
+        vectors.append((cos * query + np.sqrt(1 - cos * cos) * other) * rng.uniform(0.5, 3.0))
+    order = rng.permutation(n)
+    ids = [f"doc{i}" for i in range(n)]
+    return query.tolist(), [ids[i] for i in order], [vectors[i].tolist() for i in order]
+
+
+def _store(tmp: str, name: str, ids, vectors) -> VectorStore:
+    store = VectorStore(db_path=os.path.join(tmp, name))
+    store.add_embeddings(ids=ids, embeddings=vectors, documents=[f"text of {i}" for i in ids])
+    return store
+
+
+def _top_ids(store: VectorStore, query, top_k: int):
+    return [_id for _id, *_ in store.query_by_embedding(query, top_k=top_k, boost_audio=False)]
+
+
+def test_int8_round_trip():
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        values = rng.normal(size=DIM) * rng.uniform(0.1, 10.0)
+        blob, scale = _encode_vector(values)
+        decoded = np.frombuffer(blob, dtype=np.int8).astype(np.float32) * scale
+        unit = values / np.linalg.norm(values)
+        assert len(blob) == DIM
+        assert abs(float(decoded @ unit) / np.linalg.norm(decoded) - 1.0) < INT8_TOLERANCE
+
+
+def test_decodes_int8_float32_and_legacy_rows():
+    values = np.random.default_rng(2).normal(size=DIM)
+    unit = values / np.linalg.norm(values)
+    int8_blob, int8_scale = _encode_vector(values)
+    rows = [
+        (1, "int8", "", int8_blob, int8_scale, None, "a.txt"),
+        (2, "float32", "", unit.astype("<f4").tobytes(), None, None, "b.txt"),
+        (3, "legacy", json.dumps(values.tolist()), None, None, None, "c.txt"),
+        (4, "unreadable", "{not json", None, None, None, "d.txt"),
+    ]
+    matrix = _build_scan_matrix(rows)
+    assert matrix.ids == ["int8", "float32", "legacy"]
+    for vec in matrix.vectors:
+        assert abs(float(vec @ unit) / np.linalg.norm(vec) - 1.0) < INT8_TOLERANCE
+
+
+def test_int8_top_k_matches_float32():
+    query, ids, vectors = _ranked_vectors(200)
+    store_int8 = vector_store.STORE_INT8
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            vector_store.STORE_INT8 = False
+            f32 = _store(tmp, "f32.db", ids, vectors)
+            vector_store.STORE_INT8 = True
+            int8 = _store(tmp, "int8.db", ids, vectors)
+        finally:
+            vector_store.STORE_INT8 = store_int8
+        assert _top_ids(int8, query, 10) == _top_ids(f32, query, 10)
+
+
+def test_legacy_json_store_migrates_and_queries():
+    query, ids, vectors = _ranked_vectors(50)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "legacy.db")
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE embeddings (id TEXT PRIMARY KEY, embedding TEXT NOT NULL, "
+            "document TEXT NOT NULL, metadata TEXT)"
+        )
+        conn.executemany(
+            "INSERT INTO embeddings VALUES (?, ?, ?, ?)",
+            [(i, json.dumps(v), f"text of {i}", "{}") for i, v in zip(ids, vectors)]
+            + [("broken", "{not json", "broken row", "{}")],
+        )
+        conn.commit()
+        conn.close()
+
+        legacy = VectorStore(db_path=path)
+        conn = sqlite3.connect(path)
+        pending = conn.execute("SELECT id FROM embeddings WHERE vec IS NULL").fetchall()
+        conn.close()
+        assert pending == [("broken",)]
+
+        fresh = _store(tmp, "fresh.db", ids, vectors)
+        assert _top_ids(legacy, query, 10) == _top_ids(fresh, query, 10)
+        assert "broken" not in _top_ids(legacy, query, len(ids) + 1)
+
+
+def test_hnsw_matches_exact_scan():
+    if vector_store.hnswlib is None:
+        print("hnswlib not installed, skipping the HNSW check")
+        return
+    query, ids, vectors = _ranked_vectors(300)
+    ann_min_rows = vector_store.ANN_MIN_ROWS
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _store(tmp, "ann.db", ids, vectors)
+        exact = _top_ids(store, query, 10)
+        try:
+            vector_store.ANN_MIN_ROWS = 1
+            approximate = _top_ids(store, query, 10)
+        finally:
+            vector_store.ANN_MIN_ROWS = ann_min_rows
+        assert approximate == exact
+
+
+def main():
+    for check in (
+        test_int8_round_trip,
+        test_decodes_int8_float32_and_legacy_rows,
+        test_int8_top_k_matches_float32,
+        test_legacy_json_store_migrates_and_queries,
+        test_hnsw_matches_exact_scan,
+    ):
+        check()
+        print(f"OK  {check.__name__}")
+
+
+if __name__ == "__main__":
+    main()